@@ -3,4 +3,4 @@
 import pyiohat.parsers
 import pyiohat.parsers.ident
 import pyiohat.parsers.quant
-from pyiohat.unify import Unify
+from pyiohat.unify import Unify, unify_files
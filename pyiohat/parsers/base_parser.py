@@ -1,7 +1,8 @@
 """Parser handler."""
 
-import csv
+import copy
 import json
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
@@ -12,6 +13,65 @@ from loguru import logger
 from unimod_mapper.unimod_mapper import UnimodMapper
 
 
+@lru_cache(maxsize=1)
+def _get_param_mapper():
+    """Create a UParma instance.
+
+    The instance is cached, so the parameter jsons are only read once per session.
+
+    Returns:
+        param_mapper (uparma.UParma): parameter mapper
+    """
+    return uparma.UParma()
+
+
+@lru_cache(maxsize=8)
+def _get_unimod_mapper(xml_file_list):
+    """Create a UnimodMapper with parsed unimod definitions.
+
+    The mapper is cached, so the unimod xml files are only parsed once per session.
+
+    Args:
+        xml_file_list (tuple): paths to user unimod xml files
+
+    Returns:
+        mod_mapper (UnimodMapper): mapper with parsed unimod definitions
+    """
+    mod_mapper = UnimodMapper(xml_file_list=list(xml_file_list))
+    # Properties are evaluated lazily, access them to parse the xml files now
+    mod_mapper.mapper
+    mod_mapper.df
+    return mod_mapper
+
+
+def _copy_unimod_mapper(xml_file_list):
+    """Create a mapper sharing the parsed unimod definitions of the cached one.
+
+    The copy gets its own mass combo memo, since combos are generated from the
+    modification table, which read_mapped_mods_as_df replaces per parser.
+
+    Args:
+        xml_file_list (tuple): paths to user unimod xml files
+
+    Returns:
+        mod_mapper (UnimodMapper): mapper with parsed unimod definitions
+    """
+    mod_mapper = copy.copy(_get_unimod_mapper(xml_file_list))
+    mod_mapper._combos = {}
+    return mod_mapper
+
+
+def init_mapper_caches(xml_file_lists):
+    """Fill the mapper caches, used as initializer of worker processes.
+
+    Args:
+        xml_file_lists (list): lists of paths to user unimod xml files
+    """
+    _get_param_mapper()
+    for xml_file_list in xml_file_lists:
+        _get_unimod_mapper(tuple(xml_file_list or ()))
+
+
 class BaseParser:
     """Base class of all parser types."""
 
@@ -29,8 +89,8 @@ class BaseParser:
             params = {}
         self.params = params
         self.xml_file_list = self.params.get("xml_file_list", None)
-        self.param_mapper = uparma.UParma()
-        self.mod_mapper = UnimodMapper(xml_file_list=self.xml_file_list)
+        self.param_mapper = _get_param_mapper()
+        self.mod_mapper = _copy_unimod_mapper(tuple(self.xml_file_list or ()))
         self.params["mapped_mods"] = self.mod_mapper.map_mods(
             mod_list=self.params.get("modifications", [])
         )
@@ -38,9 +98,8 @@ class BaseParser:
             mod["name"] for mod in self.params["mapped_mods"]["fix"]
         ) | set(mod["name"] for mod in self.params["mapped_mods"]["opt"])
         self.mod_mapper.read_mapped_mods_as_df(self.params["mapped_mods"])
-        self.cc = ChemicalComposition(
-            unimod_file_list=self.params.get("xml_file_list", None)
-        )
+        # Parsers change the state of their instance with use, so it is not shared
+        self.cc = ChemicalComposition(unimod_file_list=self.xml_file_list)
         self.style = None
 
     @classmethod
@@ -74,23 +133,27 @@ class BaseParser:
                                            values are new dicts with all rt values as keys
                                            values are lists with [file, precursor_mz]
         """
+        meta_df = pd.read_csv(
+            self.params["rt_pickle_name"],
+            usecols=["spectrum_id", "rt", "rt_unit", "precursor_mz", "lineage_root"],
+            dtype={"rt_unit": str, "lineage_root": str},
+            keep_default_na=False,
+            na_values={"precursor_mz": [""]},
+            float_precision="round_trip",
+        )
+        rts = meta_df["rt"].to_numpy(dtype=float)
+        rts = np.where(meta_df["rt_unit"].isin(["minute", "min"]), rts * 60.0, rts)
         rt_lookup = {}
-        with open(self.params["rt_pickle_name"], mode="r") as meta_csv:
-            meta_reader = csv.DictReader(meta_csv)
-            for row in meta_reader:
-                rt = float(row["rt"])
-                if row["rt_unit"] == "minute" or row["rt_unit"] == "min":
-                    rt *= 60.0
-                if int(row["spectrum_id"]) not in rt_lookup:
-                    rt_lookup[int(row["spectrum_id"])] = {}
-                if row["precursor_mz"] == "":
-                    precursor_mz = np.nan
-                else:
-                    precursor_mz = float(row["precursor_mz"])
-                rt_lookup[int(row["spectrum_id"])][rt] = [
-                    row["lineage_root"],
-                    precursor_mz,
-                ]
+        for spectrum_id, rt, lineage_root, precursor_mz in zip(
+            meta_df["spectrum_id"].tolist(),
+            rts.tolist(),
+            meta_df["lineage_root"].tolist(),
+            meta_df["precursor_mz"].astype(float).tolist(),
+        ):
+            if precursor_mz != precursor_mz:
+                # Missing precursor mz values are the np.nan singleton
+                precursor_mz = np.nan
+            rt_lookup.setdefault(spectrum_id, {})[rt] = [lineage_root, precursor_mz]
         return rt_lookup
 
     def sanitize(self):
@@ -102,17 +165,24 @@ class BaseParser:
         Operations are performed inplace on self.df
         """
         # Set missing columns to None and reorder columns in standardized manner
-        col_order = pd.Series(self.required_headers.keys())
-        new_cols = col_order[~col_order.isin(self.df.columns)].to_list()
-        self.df.loc[:, new_cols] = pd.NA
-        self.df = self.df.loc[
-            :,
-            col_order.tolist()
-            + sorted(self.df.columns[~self.df.columns.isin(col_order)].tolist()),
-        ]
+        col_order = list(self.required_headers.keys())
+        self.df = self.df.reindex(
+            columns=col_order
+            + sorted(c for c in self.df.columns if c not in self.required_headers),
+            fill_value=pd.NA,
+            copy=False,
+        )
         str_cols = [c for c, dtype in self.required_headers.items() if dtype == "str"]
         self.df.loc[:, str_cols] = self.df[str_cols].fillna("")
-        self.df = self.df.astype(self.required_headers)
+        # Only cast columns that do not have the target dtype yet
+        for col, dtype in self.required_headers.items():
+            if dtype == "str":
+                # Object columns never equal the str dtype, check their values instead
+                if pd.api.types.infer_dtype(self.df[col], skipna=False) == "string":
+                    continue
+            elif self.df[col].dtype == dtype:
+                continue
+            self.df[col] = self.df[col].astype(dtype, copy=False)
         # Ensure there are not any column that should not be
         if hasattr(self, "mapping_dict"):
             new_cols = set(self.mapping_dict.keys())
@@ -1,13 +1,52 @@
 """Engine parser."""
 
-import xml.etree.ElementTree as etree
+import re
+import sys
 
-import numpy as np
 import pandas as pd
-import regex as re
 from loguru import logger
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
+from pyiohat.parsers.misc import get_fixed_mods
+from pyiohat.utils import FILE_HEAD_SIZE, append_to_columns, iterparse_and_clear
+
+version_digit_regex = re.compile(r"[0-9]+")
+
+MZID_NAMESPACE = "{http://psidev.info/psi/pi/mzIdentML/1.2}"
+TAG_CV_LIST = f"{MZID_NAMESPACE}cvList"
+TAG_ANALYSIS_SOFTWARE = f"{MZID_NAMESPACE}AnalysisSoftware"
+TAG_PEPTIDE_SEQUENCE = f"{MZID_NAMESPACE}PeptideSequence"
+TAG_MODIFICATION = f"{MZID_NAMESPACE}Modification"
+TAG_PEPTIDE = f"{MZID_NAMESPACE}Peptide"
+TAG_PEPTIDE_EVIDENCE = f"{MZID_NAMESPACE}PeptideEvidence"
+TAG_ADDITIONAL_SEARCH_PARAMS = f"{MZID_NAMESPACE}AdditionalSearchParams"
+TAG_CV_PARAM = f"{MZID_NAMESPACE}cvParam"
+TAG_SEARCH_MODIFICATION = f"{MZID_NAMESPACE}SearchModification"
+TAG_MODIFICATION_PARAMS = f"{MZID_NAMESPACE}ModificationParams"
+TAG_PEPTIDE_EVIDENCE_REF = f"{MZID_NAMESPACE}PeptideEvidenceRef"
+TAG_SII = f"{MZID_NAMESPACE}SpectrumIdentificationItem"
+TAG_SIR = f"{MZID_NAMESPACE}SpectrumIdentificationResult"
+TAG_SIL = f"{MZID_NAMESPACE}SpectrumIdentificationList"
+VERSION_TAGS = ("{*}cvList", TAG_ANALYSIS_SOFTWARE)
+PEPTIDE_TAGS = (
+    TAG_PEPTIDE_SEQUENCE,
+    TAG_MODIFICATION,
+    TAG_PEPTIDE,
+    TAG_PEPTIDE_EVIDENCE,
+)
+MODIFICATION_TAGS = (
+    TAG_ADDITIONAL_SEARCH_PARAMS,
+    TAG_CV_PARAM,
+    TAG_SEARCH_MODIFICATION,
+    TAG_MODIFICATION_PARAMS,
+)
+SPECTRUM_TAGS = (
+    TAG_PEPTIDE_EVIDENCE_REF,
+    TAG_CV_PARAM,
+    TAG_SII,
+    TAG_SIR,
+    TAG_SIL,
+)
 
 
 class Comet_2020_01_4_Parser(IdentBaseParser):
@@ -44,59 +83,68 @@ class Comet_2020_01_4_Parser(IdentBaseParser):
         """
         is_mzid = file.name.endswith(".mzid")
 
-        with open(file) as f:
-            try:
-                head = "".join([next(f) for _ in range(10)])
-            except StopIteration:
-                head = ""
-        contains_engine = "Comet" in head
-        return is_mzid and contains_engine
+        if not is_mzid:
+            return False
+        # A fixed size read bounds the sniff, mzid lines can be very long
+        with open(file, "rb") as f:
+            head = f.read(FILE_HEAD_SIZE)
+        contains_engine = b"Comet" in head
+        return contains_engine
 
-    def get_version(self):
+    def get_version(self, entries=None):
         """Retrieve version from xml.
 
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
+
         Returns:
             version (str): file version
         """
+        if entries is None:
+            entries = iterparse_and_clear(self.input_file, tag=VERSION_TAGS)
         version = ""
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in entries:
             entry_tag = entry.tag
 
             if entry_tag.endswith("cvList"):
-                if entry_tag != "{http://psidev.info/psi/pi/mzIdentML/1.2}cvList":
+                if entry_tag != TAG_CV_LIST:
                     logger.warning(
                         f"{entry_tag}: Wrong mzIdentML version - Parser made for version 1.2!"
                     )
-            elif entry_tag.endswith("AnalysisSoftware"):
+            elif entry_tag == TAG_ANALYSIS_SOFTWARE:
                 version = "comet_" + "_".join(
-                    re.findall("[0-9]+", entry.attrib["version"])
+                    version_digit_regex.findall(entry.attrib["version"])
                 )
                 break
-            entry.clear()
         return version
 
-    def map_mod_mass(self):
+    def map_mod_mass(self, entries=None):
         """Retrieve information on modifications from xml.
 
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
+
         Returns:
             fixed_mods (dict): residues and corresponding names of fixed modifications
-            mod_mass_map (dict): mapping of masses to modification names
+            mod_mass_map (dict): mapping of masses, rounded to 4 decimals, to modification names
         """
+        if entries is None:
+            entries = iterparse_and_clear(self.input_file, tag=MODIFICATION_TAGS)
         fixed_mods = {}
         mod_mass_map = {}
 
         mod_name = ""
         modification_information = False
 
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in entries:
             entry_tag = entry.tag
 
-            if entry_tag.endswith("AdditionalSearchParams"):
+            if entry_tag == TAG_ADDITIONAL_SEARCH_PARAMS:
                 modification_information = True
             elif modification_information is True:
-                if entry_tag.endswith("cvParam"):
+                if entry_tag == TAG_CV_PARAM:
                     mod_name = entry.attrib["name"]
-                elif entry_tag.endswith("SearchModification"):
+                elif entry_tag == TAG_SEARCH_MODIFICATION:
                     if mod_name == "unknown modification":
                         potential_mod = self.mod_mapper.mass_to_names(
                             float(entry.attrib["massDelta"]), decimals=4
@@ -108,135 +156,164 @@ class Comet_2020_01_4_Parser(IdentBaseParser):
                             raise ValueError
                         else:
                             mod_name = potential_mod[0]
-                    mod_mass_map[entry.attrib["massDelta"]] = mod_name
+                    mod_mass_map[round(float(entry.attrib["massDelta"]), 4)] = mod_name
                     if entry.attrib["fixedMod"] == "true":
                         residue = entry.attrib["residues"]
                         fixed_mods[residue] = mod_name
-                elif entry_tag.endswith("ModificationParams"):
+                elif entry_tag == TAG_MODIFICATION_PARAMS:
                     break
-            entry.clear()
         return fixed_mods, mod_mass_map
 
-    def get_peptide_lookup(self):
-        """Retrieve peptide ids with their corresponding sequences and modifications from xml.
+    def read_peptides(self, entries=None):
+        """Retrieve peptide ids with their corresponding sequences and modification masses from xml.
+
+        Modification names are not resolved here, since the modification parameters
+        are located after the peptides in the xml.
+
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
 
         Returns:
-            peptide_lookup (dict): peptide id with corresponding modifications and sequence
+            peptides (dict): peptide id with corresponding sequence and list of (mass, location) tuples
         """
-        peptide_lookup = {}
+        if entries is None:
+            entries = iterparse_and_clear(self.input_file, tag=PEPTIDE_TAGS)
+        peptides = {}
 
         modifications = []
         sequence = {}
         peptide_information = False
 
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in entries:
             entry_tag = entry.tag
 
-            if entry_tag.endswith("PeptideSequence"):
+            if entry_tag == TAG_PEPTIDE_SEQUENCE:
                 peptide_information = True
             if peptide_information is True:
-                if entry_tag.endswith("PeptideSequence"):
-                    sequence = entry.text
-                    if len(self.fixed_mods) > 0:
-                        sequence_mod_map = self.map_mods_sequences(sequence)
-                        if sequence_mod_map != "":
-                            modifications.append(sequence_mod_map)
-                elif entry_tag.endswith("Modification"):
-                    mass = entry.attrib["monoisotopicMassDelta"]
-                    location = entry.attrib["location"]
-                    mass_name = self.mod_mass_map[mass]
-                    modifications.append(mass_name + ":" + location)
-                elif entry_tag.endswith("Peptide"):
-                    peptide_lookup[entry.attrib["id"]] = (
-                        ";".join(modifications),
-                        sequence,
+                if entry_tag == TAG_PEPTIDE_SEQUENCE:
+                    sequence = sys.intern(entry.text)
+                elif entry_tag == TAG_MODIFICATION:
+                    attrib = entry.attrib
+                    modifications.append(
+                        (attrib["monoisotopicMassDelta"], attrib["location"])
                     )
+                elif entry_tag == TAG_PEPTIDE:
+                    peptides[entry.attrib["id"]] = (sequence, modifications)
                     modifications = []
-                elif entry_tag.endswith("PeptideEvidence"):
+                elif entry_tag == TAG_PEPTIDE_EVIDENCE:
                     break
-            entry.clear()
+        return peptides
+
+    def map_peptide_modifications(self, peptides):
+        """Map fixed modifications and modification masses onto the peptides.
+
+        Args:
+            peptides (dict): peptide id with corresponding sequence and list of (mass, location) tuples
+
+        Returns:
+            peptide_lookup (dict): peptide id with corresponding modifications and sequence
+        """
+        peptide_lookup = {}
+        # Peptides share a small set of modification strings, store each only once
+        modification_strings = {}
+        mod_mass_map = self.mod_mass_map
+        # Mass attributes repeat across peptides, round and map each string once
+        mass_names = {}
+        fixed_modifications = self.map_fixed_mods(
+            [sequence for sequence, _ in peptides.values()]
+        )
+        for (peptide_id, (sequence, masses_and_locations)), modifications in zip(
+            peptides.items(), fixed_modifications
+        ):
+            for mass, location in masses_and_locations:
+                name = mass_names.get(mass)
+                if name is None:
+                    name = mass_names[mass] = mod_mass_map[round(float(mass), 4)]
+                modifications.append(f"{name}:{location}")
+            modifications = ";".join(modifications)
+            modifications = modification_strings.setdefault(
+                modifications, modifications
+            )
+            peptide_lookup[peptide_id] = (modifications, sequence)
         return peptide_lookup
 
-    def get_spec_records(self):
+    def get_peptide_lookup(self, entries=None):
+        """Retrieve peptide ids with their corresponding sequences and modifications from xml.
+
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
+
+        Returns:
+            peptide_lookup (dict): peptide id with corresponding modifications and sequence
+        """
+        return self.map_peptide_modifications(self.read_peptides(entries))
+
+    def get_spec_records(self, entries=None):
         """Retrieve specs from file.
 
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
+
         Returns:
-            spec_records (list): information on PSMs
+            spec_records (dict): column names with lists of PSM information
         """
-        spec_records = []
+        if entries is None:
+            entries = iterparse_and_clear(self.input_file, tag=SPECTRUM_TAGS)
+        spec_records = {}
+        mapping_get = self.mapping_dict.get
+        peptide_lookup = self.peptide_lookup
 
         spec_results = {}
         spec_ident_items = []
         spec_information = False
 
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in entries:
             entry_tag = entry.tag
 
-            if entry_tag.endswith("PeptideEvidenceRef"):
+            if entry_tag == TAG_PEPTIDE_EVIDENCE_REF:
                 spec_information = True
             if spec_information is True:
-                if entry_tag.endswith("cvParam"):
-                    if entry.attrib["name"] in self.mapping_dict:
-                        _key = self.mapping_dict[entry.attrib["name"]]
-                        spec_results[_key] = entry.attrib["value"]
-                elif entry_tag.endswith("SpectrumIdentificationItem"):
-                    for attribute in list(entry.attrib):
-                        if attribute in self.mapping_dict.keys():
-                            _key = self.mapping_dict[attribute]
-                            spec_results[_key] = entry.attrib[attribute]
-                    mods, sequence = self.peptide_lookup[spec_results["sequence"]]
+                attrib = entry.attrib
+                if entry_tag == TAG_CV_PARAM:
+                    _key = mapping_get(attrib["name"])
+                    if _key is not None:
+                        spec_results[_key] = attrib["value"]
+                elif entry_tag == TAG_SII:
+                    for attribute, value in attrib.items():
+                        _key = mapping_get(attribute)
+                        if _key is not None:
+                            spec_results[_key] = value
+                    mods, sequence = peptide_lookup[spec_results["sequence"]]
                     spec_results["modifications"] = mods
                     spec_results["sequence"] = sequence
                     spec_ident_items.append(spec_results)
                     spec_results = {}
-                elif entry_tag.endswith("SpectrumIdentificationResult"):
-                    for spec_item in spec_ident_items:
-                        spec_item.update(spec_results)
-                        spec_item["spectrum_id"] = entry.attrib["spectrumID"].lstrip(
-                            "scan="
-                        )
-                        spec_records.append(spec_item)
+                elif entry_tag == TAG_SIR:
+                    if spec_ident_items:
+                        spectrum_id = attrib["spectrumID"]
+                        # lstrip would remove any of the characters, not the prefix
+                        if spectrum_id.startswith("scan="):
+                            spectrum_id = spectrum_id[5:]
+                        for spec_item in spec_ident_items:
+                            spec_item.update(spec_results)
+                            spec_item["spectrum_id"] = spectrum_id
+                            append_to_columns(spec_records, spec_item)
                     spec_results = {}
                     spec_ident_items = []
-                elif entry_tag.endswith("SpectrumIdentificationList"):
+                elif entry_tag == TAG_SIL:
                     break
-            entry.clear()
         return spec_records
 
-    def map_mods_sequences(self, sequence):
-        """Map fixed_mods and sequence to get corresponding modifications.
-
-        fixed_mods needs at least one entry!
+    def map_fixed_mods(self, sequences):
+        """Map fixed_mods onto all sequences at once.
 
         Args:
-            sequence (str): peptide sequence
+            sequences (list): peptide sequences
 
         Returns:
-            fixed_mod_strings (str): modifications of corresponding sequence
+            fixed_modifications (list): list of fixed modifications per sequence
         """
-        fixed_mod_strings = []
-
-        for fm_res, fm_name in self.fixed_mods.items():
-            fixed_mod_strings.append(
-                pd.Series(sequence)
-                .str.split(fm_res)
-                .apply(
-                    lambda l: ";".join(
-                        [
-                            fm_name + ":" + ind
-                            for ind in (
-                                np.cumsum(list(map(len, l[:-1]))) + range(1, len(l))
-                            ).astype(str)
-                        ]
-                    )
-                )
-            )
-
-        fixed_mod_strings = (
-            pd.concat(fixed_mod_strings, axis=1).agg(";".join, axis=1).str.rstrip(";")
-        )
-        fixed_mod_strings = fixed_mod_strings[0]
-        return fixed_mod_strings
+        return get_fixed_mods(sequences, self.fixed_mods.items())
 
     def unify(self):
         """
@@ -245,10 +322,16 @@ class Comet_2020_01_4_Parser(IdentBaseParser):
         Returns:
             self.df (pd.DataFrame): unified dataframe
         """
-        self.version = self.get_version()
-        self.fixed_mods, self.mod_mass_map = self.map_mod_mass()
-        self.peptide_lookup = self.get_peptide_lookup()
-        self.spec_records = self.get_spec_records()
+        # The file is parsed in a single pass, sections are read in document order
+        entries = iterparse_and_clear(
+            self.input_file,
+            tag=VERSION_TAGS + PEPTIDE_TAGS + MODIFICATION_TAGS + SPECTRUM_TAGS,
+        )
+        self.version = self.get_version(entries)
+        peptides = self.read_peptides(entries)
+        self.fixed_mods, self.mod_mass_map = self.map_mod_mass(entries)
+        self.peptide_lookup = self.map_peptide_modifications(peptides)
+        self.spec_records = self.get_spec_records(entries)
         self.df = pd.DataFrame(self.spec_records)
         self.df["search_engine"] = self.version
         self.process_unify_style()
@@ -1,24 +1,40 @@
 """Engine parser."""
 
 import multiprocessing as mp
+import re
 import sys
 from itertools import repeat
 
-import numpy as np
 import pandas as pd
-import regex as re
 from loguru import logger
 from tqdm import tqdm
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
-from pyiohat.utils import merge_and_join_dicts
+from pyiohat.parsers.misc import get_fixed_mods
+from pyiohat.utils import (
+    FILE_HEAD_SIZE,
+    append_to_columns,
+    extend_columns,
+    merge_and_join_dicts,
+)
 
 mascot_custom_psm_regex = re.compile(
     r"(?:[-+0-9]+),(?P<exp_mass>[0-9\.]+),(?:[-0-9\.]+),(?P<n_matched_ions>[0-9]+),(?P<seq>[A-Z]+),(?:[0-9]+),(?P<opt_mod_string>[0-9]+),(?P<score>[.0-9]+),(?:[0-9]+),(?:.+subst;)(?P<subst>.+)"
 )
+mascot_title_regex = re.compile(r"(?<=title=)(.+)")
+mascot_charge_regex = re.compile(r"(?<=charge=)(\d+)")
+mascot_scans_regex = re.compile(r"(?<=scans=)(\d+)")
+mascot_rt_regex = re.compile(r"(?<=rtinseconds=)(\d+\.\d+)")
+mascot_file_section_regex = re.compile(
+    r"(?:Content-Type: application/x-Mascot; name=\")([\w+]*)"
+)
+# Filters for non empty data and only respective _subst metainfo
+mascot_peptide_filter_regex = re.compile(
+    r"q[\d]+_p[\d]+=(?!-1$).+|q[\d]+_p[\d]+_subst=.+"
+)
 
 
-def _get_single_spec_df(reference_dict, spectrum):
+def _get_single_spec_records(reference_dict, spectrum):
     """Primary method for reading and storing information from a single spectrum.
 
     Args:
@@ -26,28 +42,26 @@ def _get_single_spec_df(reference_dict, spectrum):
         spectrum (tuple): spectrum data
 
     Returns:
-        (pd.DataFrame): dataframe for single spec id
+        spec_records (dict): column names with lists of PSM information
 
     """
-    spec_records = []
+    spec_records = {}
     spec_level_dict = reference_dict.copy()
     query, spec_level_info = spectrum[:2]
 
-    spec_level_dict["spectrum_title"] = re.search(
-        r"(?<=title=)(.+)", spec_level_info
+    spec_level_dict["spectrum_title"] = mascot_title_regex.search(
+        spec_level_info
     ).group()
-    spec_level_dict["charge"] = re.search(r"(?<=charge=)(\d+)", spec_level_info).group()
-    spec_level_dict["spectrum_id"] = re.search(
-        r"(?<=scans=)(\d+)", spec_level_info
-    ).group()
-    spec_level_dict["retention_time_seconds"] = re.search(
-        r"(?<=rtinseconds=)(\d+\.\d+)", spec_level_info
+    spec_level_dict["charge"] = mascot_charge_regex.search(spec_level_info).group()
+    spec_level_dict["spectrum_id"] = mascot_scans_regex.search(spec_level_info).group()
+    spec_level_dict["retention_time_seconds"] = mascot_rt_regex.search(
+        spec_level_info
     ).group()
 
     # Iterate children
     for psm in spectrum[2]:
         psm_level_dict = spec_level_dict.copy()
-        psm_level_info = re.search(mascot_custom_psm_regex, psm).groupdict()
+        psm_level_info = mascot_custom_psm_regex.search(psm).groupdict()
         psm_level_dict["exp_mz"] = psm_level_info["exp_mass"]
         psm_level_dict["mascot:num_matched_ions"] = psm_level_info["n_matched_ions"]
         psm_level_dict["sequence"] = psm_level_info["seq"]
@@ -55,9 +69,9 @@ def _get_single_spec_df(reference_dict, spectrum):
         psm_level_dict["mascot:score"] = psm_level_info["score"]
         psm_level_dict["subst"] = psm_level_info["subst"]
 
-        spec_records.append(psm_level_dict)
+        append_to_columns(spec_records, psm_level_dict)
 
-    return pd.DataFrame(spec_records)
+    return spec_records
 
 
 class Mascot_2_6_2_Parser(IdentBaseParser):
@@ -100,33 +114,27 @@ class Mascot_2_6_2_Parser(IdentBaseParser):
 
         """
         is_dat = file.as_posix().endswith(".dat")
-
-        with open(file.as_posix()) as f:
-            try:
-                head = "".join([next(f) for _ in range(5)])
-            except StopIteration:
-                head = ""
-        contains_engine = "Mascot" in head
-        return is_dat and contains_engine
+        if not is_dat:
+            return False
+        # Mascot names itself in the MIME header, a fixed size read bounds the sniff
+        with open(file, "rb") as f:
+            head = f.read(FILE_HEAD_SIZE)
+        contains_engine = b"Mascot" in head
+        return contains_engine
 
     def _get_data_on_spectrum_level(self):
         """Provide aggregated data on spectrum level."""
         with open(self.input_file) as f:
             file_str = f.read()
 
-        file_section_pattern = re.compile(
-            r"(?:Content-Type: application/x-Mascot; name=\")([\w+]*)"
-        )
-        section_split = re.split(file_section_pattern, file_str)[1:]
+        section_split = mascot_file_section_regex.split(file_str)[1:]
         section_data = {k: v for k, v in zip(section_split[::2], section_split[1::2])}
 
-        # Filters for non empty data and only respective _subst metainfo
-        filter_pattern = re.compile(r"q[\d]+_p[\d]+=(?!-1$).+|q[\d]+_p[\d]+_subst=.+")
         peptide_data = dict(
             [
                 peptide.split("=")
                 for peptide in section_data["peptides"].split("\n")[2:-2]
-                if re.match(filter_pattern, peptide)
+                if mascot_peptide_filter_regex.match(peptide)
             ]
         )
         base_entries = {k: v for k, v in peptide_data.items() if "_subst" not in k}
@@ -183,32 +191,17 @@ class Mascot_2_6_2_Parser(IdentBaseParser):
 
         Operations are performed inplace.
         """
-        fix_mods = None
-        for name, aa in self.mods["fix"].items():
-            fm_strings = (
-                self.df["sequence"]
-                .str.split(aa)
-                .apply(
-                    lambda l: ";".join(
-                        [
-                            name + ":" + ind
-                            for ind in (
-                                np.cumsum(list(map(len, l[:-1]))) + range(1, len(l))
-                            ).astype(str)
-                        ]
-                    )
-                )
-            )
-            if fix_mods is None:
-                fix_mods = fm_strings
-            else:
-                fix_mods = fix_mods + ";" + fm_strings + ";"
-
         self.df.loc[:, "modifications"] = (
             self.df["modifications"].apply(self._translate_opt_mods).to_list()
         )
-        if fix_mods is not None:
-            self.df.loc[:, "modifications"] += fix_mods
+        if len(self.mods["fix"]) > 0:
+            fix_mods = get_fixed_mods(
+                self.df["sequence"].to_list(),
+                ((aa, name) for name, aa in self.mods["fix"].items()),
+            )
+            self.df.loc[:, "modifications"] += [
+                ";".join(mods) + ";" for mods in fix_mods
+            ]
 
         # Add substitutions
         if self.df["subst"].str.match(r"(\d+,\w,\w)").any():
@@ -242,13 +235,18 @@ class Mascot_2_6_2_Parser(IdentBaseParser):
             total=len(self.spectrum_data),
         )
         with mp.Pool(self.params.get("cpus", mp.cpu_count() - 1)) as pool:
-            chunk_dfs = pool.starmap(
-                _get_single_spec_df,
+            chunk_records = pool.starmap(
+                _get_single_spec_records,
                 pbar_iterator,
             )
         logger.remove()
         logger.add(sys.stdout)
-        self.df = pd.concat(chunk_dfs, axis=0, ignore_index=True)
+        # Extend column lists and build the dataframe once, instead of
+        # concatenating one small dataframe per spectrum
+        spec_records = {}
+        for records in chunk_records:
+            extend_columns(spec_records, records)
+        self.df = pd.DataFrame(spec_records)
         self.df.loc[:, "spectrum_title"] = (
             self.df["spectrum_title"]
             .str.replace("%2e", ".", regex=False)
@@ -1,7 +1,8 @@
 """Engine parser."""
 
+import re
+
 import pandas as pd
-import regex as re
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
 
@@ -56,13 +57,15 @@ class MSAmanda_2_Parser(IdentBaseParser):
         """
         # It is a csv file even though it is technically tab-delimited
         is_csv = file.as_posix().endswith(".csv")
+        if not is_csv:
+            return False
         with open(file.as_posix()) as f:
             try:
                 head = "".join([next(f) for _ in range(1)])
             except StopIteration:
                 head = ""
         matches_version = "#version: 2." in head
-        return is_csv and matches_version
+        return matches_version
 
     def _map_mod_translation(self, row):
         """Replace single mod string.
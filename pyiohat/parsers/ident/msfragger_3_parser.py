@@ -1,9 +1,9 @@
 """Engine parser."""
 
 import itertools
+import re
 
 import pandas as pd
-import regex as re
 from loguru import logger
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
@@ -50,6 +50,8 @@ class MSFragger_3_Parser(IdentBaseParser):
 
         """
         is_tsv = file.as_posix().endswith(".tsv")
+        if not is_tsv:
+            return False
         with open(file.as_posix()) as f:
             try:
                 head = "".join([next(f) for _ in range(1)])
@@ -83,7 +85,7 @@ class MSFragger_3_Parser(IdentBaseParser):
             "delta_score",
         }
         columns_match = len(ref_columns.difference(head)) == 0
-        return is_tsv and columns_match
+        return columns_match
 
     def _map_mod_translation(self, row, map_dict):
         """Replace single mod string.
@@ -1,12 +1,45 @@
 """Engine parser."""
 
-import xml.etree.ElementTree as etree
+import re
+import sys
 
 import pandas as pd
-import regex as re
 from loguru import logger
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
+from pyiohat.utils import FILE_HEAD_SIZE, append_to_columns, iterparse_and_clear
+
+version_digit_regex = re.compile(r"[0-9]+")
+
+MZID_NAMESPACE = "{http://psidev.info/psi/pi/mzIdentML/1.1}"
+TAG_CV_LIST = f"{MZID_NAMESPACE}cvList"
+TAG_ANALYSIS_SOFTWARE = f"{MZID_NAMESPACE}AnalysisSoftware"
+TAG_PEPTIDE_SEQUENCE = f"{MZID_NAMESPACE}PeptideSequence"
+TAG_CV_PARAM = f"{MZID_NAMESPACE}cvParam"
+TAG_MODIFICATION = f"{MZID_NAMESPACE}Modification"
+TAG_PEPTIDE = f"{MZID_NAMESPACE}Peptide"
+TAG_PEPTIDE_EVIDENCE = f"{MZID_NAMESPACE}PeptideEvidence"
+TAG_FRAGMENTATION_TABLE = f"{MZID_NAMESPACE}FragmentationTable"
+TAG_USER_PARAM = f"{MZID_NAMESPACE}userParam"
+TAG_SII = f"{MZID_NAMESPACE}SpectrumIdentificationItem"
+TAG_SIR = f"{MZID_NAMESPACE}SpectrumIdentificationResult"
+TAG_SIL = f"{MZID_NAMESPACE}SpectrumIdentificationList"
+VERSION_TAGS = ("{*}cvList", TAG_ANALYSIS_SOFTWARE)
+PEPTIDE_TAGS = (
+    TAG_PEPTIDE_SEQUENCE,
+    TAG_CV_PARAM,
+    TAG_MODIFICATION,
+    TAG_PEPTIDE,
+    TAG_PEPTIDE_EVIDENCE,
+)
+SPECTRUM_TAGS = (
+    TAG_FRAGMENTATION_TABLE,
+    TAG_CV_PARAM,
+    TAG_USER_PARAM,
+    TAG_SII,
+    TAG_SIR,
+    TAG_SIL,
+)
 
 
 class MSGFPlus_2021_03_22_Parser(IdentBaseParser):
@@ -41,122 +74,144 @@ class MSGFPlus_2021_03_22_Parser(IdentBaseParser):
         """
         is_mzid = file.name.endswith(".mzid")
 
-        with open(file) as f:
-            try:
-                head = "".join([next(f) for _ in range(20)])
-            except StopIteration:
-                head = ""
-        contains_engine = "MS-GF+" in head
-        return is_mzid and contains_engine
+        if not is_mzid:
+            return False
+        # A fixed size read bounds the sniff, mzid lines can be very long
+        with open(file, "rb") as f:
+            head = f.read(FILE_HEAD_SIZE)
+        contains_engine = b"MS-GF+" in head
+        return contains_engine
 
-    def get_version(self):
+    def get_version(self, entries=None):
         """Retrieve version from xml.
 
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
+
         Returns:
             version (str): file version
         """
+        if entries is None:
+            entries = iterparse_and_clear(self.input_file, tag=VERSION_TAGS)
         version = ""
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in entries:
             entry_tag = entry.tag
 
             if entry_tag.endswith("cvList"):
-                if entry_tag != "{http://psidev.info/psi/pi/mzIdentML/1.1}cvList":
+                if entry_tag != TAG_CV_LIST:
                     logger.warning(
                         f"{entry_tag}: Wrong mzIdentML version - Parser made for version 1.1.0!"
                     )
-            elif entry_tag.endswith("AnalysisSoftware"):
+            elif entry_tag == TAG_ANALYSIS_SOFTWARE:
                 version = "msgfplus_" + "_".join(
-                    re.findall("[0-9]+", entry.attrib["version"])
+                    version_digit_regex.findall(entry.attrib["version"])
                 )
                 break
-            entry.clear()
         return version
 
-    def get_peptide_lookup(self):
+    def get_peptide_lookup(self, entries=None):
         """Retrieve peptide ids with their corresponding sequences and modifications from xml.
 
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
+
         Returns:
             peptide_lookup (dict): peptide id with corresponding modifications and sequence
         """
+        if entries is None:
+            entries = iterparse_and_clear(self.input_file, tag=PEPTIDE_TAGS)
         peptide_lookup = {}
+        # Peptides share a small set of modification strings, store each only once
+        modification_strings = {}
 
-        cv_param_modifications = ""
+        modification_names = []
+        modifications = []
         peptide_information = False
 
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in entries:
             entry_tag = entry.tag
 
-            if entry_tag.endswith("PeptideSequence"):
+            if entry_tag == TAG_PEPTIDE_SEQUENCE:
                 peptide_information = True
             if peptide_information is True:
-                if entry_tag.endswith("PeptideSequence"):
-                    sequence = {"sequence": entry.text}
-                elif entry_tag.endswith("cvParam"):
-                    if entry.attrib["name"] == "unknown modification":
-                        cv_param_modifications += entry.attrib["value"] + ":"
+                if entry_tag == TAG_PEPTIDE_SEQUENCE:
+                    sequence = sys.intern(entry.text)
+                elif entry_tag == TAG_CV_PARAM:
+                    attrib = entry.attrib
+                    if attrib["name"] == "unknown modification":
+                        modification_names.append(attrib["value"])
                     else:
-                        cv_param_modifications += entry.attrib["name"] + ":"
-                elif entry_tag.endswith("Modification"):
-                    cv_param_modifications += entry.attrib["location"] + ";"
-                elif entry_tag.endswith("Peptide"):
-                    peptide_lookup[entry.attrib["id"]] = sequence
-                    peptide_lookup[entry.attrib["id"]]["modifications"] = (
-                        cv_param_modifications.rstrip(";")
+                        modification_names.append(attrib["name"])
+                elif entry_tag == TAG_MODIFICATION:
+                    modification_names.append(entry.attrib["location"])
+                    modifications.append(":".join(modification_names))
+                    modification_names = []
+                elif entry_tag == TAG_PEPTIDE:
+                    modification_string = ";".join(modifications)
+                    modification_string = modification_strings.setdefault(
+                        modification_string, modification_string
                     )
-                    cv_param_modifications = ""
-                elif entry_tag.endswith("PeptideEvidence"):
+                    peptide_lookup[entry.attrib["id"]] = (
+                        modification_string,
+                        sequence,
+                    )
+                    modifications = []
+                elif entry_tag == TAG_PEPTIDE_EVIDENCE:
                     break
-            entry.clear()
         return peptide_lookup
 
-    def get_spec_records(self):
+    def get_spec_records(self, entries=None):
         """Retrieve specs from file.
 
+        Args:
+            entries (generator, optional): xml elements shared between the parse steps
+
         Returns:
-            spec_records (list): information on PSMs
+            spec_records (dict): column names with lists of PSM information
         """
-        spec_records = []
+        if entries is None:
+            entries = iterparse_and_clear(self.input_file, tag=SPECTRUM_TAGS)
+        spec_records = {}
+        mapping_get = self.mapping_dict.get
+        peptide_lookup = self.peptide_lookup
 
         spec_results = {}
         spec_ident_items = []
         spec_information = False
 
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in entries:
             entry_tag = entry.tag
 
-            if entry_tag.endswith("FragmentationTable"):
+            if entry_tag == TAG_FRAGMENTATION_TABLE:
                 spec_information = True
             elif spec_information is True:
-                if entry_tag.endswith("cvParam") or entry_tag.endswith("userParam"):
-                    if entry.attrib["name"] in self.mapping_dict:
-                        _key = self.mapping_dict[entry.attrib["name"]]
-                        spec_results[_key] = entry.attrib["value"]
-                elif entry_tag.endswith("SpectrumIdentificationItem"):
-                    for attribute in list(entry.attrib):
-                        if attribute in self.mapping_dict.keys():
-                            if attribute == "peptide_ref":
-                                psm_id = entry.attrib[attribute]
-                                spec_results["sequence"] = self.peptide_lookup[psm_id][
-                                    "sequence"
-                                ]
-                                spec_results["modifications"] = self.peptide_lookup[
-                                    psm_id
-                                ]["modifications"]
-                            else:
-                                _key = self.mapping_dict[attribute]
-                                spec_results[_key] = entry.attrib[attribute]
+                attrib = entry.attrib
+                if entry_tag in (TAG_CV_PARAM, TAG_USER_PARAM):
+                    _key = mapping_get(attrib["name"])
+                    if _key is not None:
+                        spec_results[_key] = attrib["value"]
+                elif entry_tag == TAG_SII:
+                    for attribute, value in attrib.items():
+                        _key = mapping_get(attribute)
+                        if _key is None:
+                            continue
+                        if attribute == "peptide_ref":
+                            mods, sequence = peptide_lookup[value]
+                            spec_results["sequence"] = sequence
+                            spec_results["modifications"] = mods
+                        else:
+                            spec_results[_key] = value
                     # multiple SpectrumIdentificationItems possible, therefore create a list and reset spec_results
                     spec_ident_items.append(spec_results)
                     spec_results = {}
-                elif entry_tag.endswith("SpectrumIdentificationResult"):
+                elif entry_tag == TAG_SIR:
                     for spec_item in spec_ident_items:
                         spec_item.update(spec_results)
-                        spec_records.append(spec_item)
+                        append_to_columns(spec_records, spec_item)
                     spec_results = {}
                     spec_ident_items = []
-                elif entry_tag.endswith("SpectrumIdentificationList"):
+                elif entry_tag == TAG_SIL:
                     break
-            entry.clear()
         return spec_records
 
     def unify(self):
@@ -166,9 +221,13 @@ class MSGFPlus_2021_03_22_Parser(IdentBaseParser):
         Returns:
             self.df (pd.DataFrame): unified dataframe
         """
-        self.version = self.get_version()
-        self.peptide_lookup = self.get_peptide_lookup()
-        self.spec_records = self.get_spec_records()
+        # The file is parsed in a single pass, sections are read in document order
+        entries = iterparse_and_clear(
+            self.input_file, tag=VERSION_TAGS + PEPTIDE_TAGS + SPECTRUM_TAGS
+        )
+        self.version = self.get_version(entries)
+        self.peptide_lookup = self.get_peptide_lookup(entries)
+        self.spec_records = self.get_spec_records(entries)
         self.df = pd.DataFrame(self.spec_records)
         self.df["search_engine"] = self.version
         self.process_unify_style()
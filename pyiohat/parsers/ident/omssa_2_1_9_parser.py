@@ -1,9 +1,9 @@
 """Engine parser."""
 
-import numpy as np
 import pandas as pd
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
+from pyiohat.parsers.misc import get_fixed_mods
 
 
 class Omssa_Parser(IdentBaseParser):
@@ -51,6 +51,8 @@ class Omssa_Parser(IdentBaseParser):
 
         """
         is_csv = file.as_posix().endswith(".csv")
+        if not is_csv:
+            return False
         with open(file.as_posix()) as f:
             try:
                 head = "".join([next(f) for _ in range(1)])
@@ -75,7 +77,7 @@ class Omssa_Parser(IdentBaseParser):
             " NIST score",
         }
         columns_match = len(ref_columns.difference(head)) == 0
-        return is_csv and columns_match
+        return columns_match
 
     def _replace_mod_strings(self, row, mod_translations):
         """Replace single mod string.
@@ -114,35 +116,17 @@ class Omssa_Parser(IdentBaseParser):
         self.df["modifications"] = (
             self.df["modifications"].fillna("").str.replace(" ,", ";")
         )
-        fix_mods = None
         # Map fixed mods
         fixed_mod_types = [
-            d for d in self.params["modifications"] if d["type"] == "fix"
+            (d["aa"], d["name"])
+            for d in self.params["modifications"]
+            if d["type"] == "fix"
         ]
-        for fm in fixed_mod_types:
-            fm_strings = (
-                self.df["sequence"]
-                .str.split(fm["aa"])
-                .apply(
-                    lambda l: ";".join(
-                        [
-                            fm["name"] + ":" + ind
-                            for ind in (
-                                np.cumsum(list(map(len, l[:-1]))) + range(1, len(l))
-                            ).astype(str)
-                        ]
-                    )
-                )
-            )
-            if fix_mods is None:
-                fix_mods = fm_strings
-            else:
-                fix_mods = fix_mods + ";" + fm_strings
-
-        if fix_mods is not None:
-            self.df["modifications"] = (
-                self.df["modifications"].fillna("") + ";" + fix_mods
-            )
+        if len(fixed_mod_types) > 0:
+            fix_mods = get_fixed_mods(self.df["sequence"].to_list(), fixed_mod_types)
+            self.df["modifications"] = self.df["modifications"].fillna("") + [
+                ";" + ";".join(mods) for mods in fix_mods
+            ]
 
     def unify(self):
         """
@@ -1,12 +1,15 @@
 """Engine parser."""
 
-import xml.etree.ElementTree as etree
+import re
+from itertools import chain
 
 import pandas as pd
-import regex as re
 from loguru import logger
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
+from pyiohat.utils import FILE_HEAD_SIZE, append_to_columns, iterparse_and_clear
+
+tandem_version_regex = re.compile(r"(?<=Tandem )\w+")
 
 
 class XTandemAlanine_Parser(IdentBaseParser):
@@ -39,72 +42,69 @@ class XTandemAlanine_Parser(IdentBaseParser):
             bool: True if parser and file are compatible
         """
         is_xml = file.name.endswith(".xml")
-        with open(file) as f:
-            try:
-                head = "".join([next(f) for _ in range(10)])
-            except StopIteration:
-                head = ""
-        contains_ref = "tandem-style.xsl" in head
+        if not is_xml:
+            return False
+        # A fixed size read bounds the sniff, xml lines can be very long
+        with open(file, "rb") as f:
+            head = f.read(FILE_HEAD_SIZE)
+        contains_ref = b"tandem-style.xsl" in head
 
-        return is_xml and contains_ref
+        return contains_ref
 
     def get_spec_records(self):
         """Retrieve specs and search_engine from file.
 
         Returns:
-            spec_records (list): information on PSMs
+            spec_records (dict): column names with lists of PSM information
             search_engine (str): file version
         """
-        spec_records = []
+        spec_records = {}
         search_engine = ""
+        mapping_get = self.mapping_dict.get
 
         results = {}
         domains = []
-        mods = []
         aa_mods = []
 
-        for event, entry in etree.iterparse(self.input_file):
+        for entry in iterparse_and_clear(
+            self.input_file, tag=("aa", "domain", "note", "group")
+        ):
             entry_tag = entry.tag
+            entry_attrib = entry.attrib
 
             if entry_tag == ("aa"):
-                aa_mods.append(
-                    {"mass": entry.attrib["modified"], "at": entry.attrib["at"]}
-                )
+                aa_mods.append((entry_attrib["modified"], int(entry_attrib["at"])))
             elif entry_tag == ("domain"):
-                for attrib in list(entry.attrib):
-                    if attrib in self.mapping_dict:
-                        _key = self.mapping_dict[attrib]
-                        results[_key] = entry.attrib[attrib]
-                for aa in aa_mods:
-                    mass = aa["mass"]
-                    at = aa["at"]
-                    start = entry.attrib["start"]
-                    rel_pos = int(at) - int(start)
-                    mods.append(f"{mass}:{rel_pos}")
-                results["modifications"] = mods
-                results["calc_mz"] = entry.attrib["mh"]
-                mods = []
+                for attrib, value in entry_attrib.items():
+                    _key = mapping_get(attrib)
+                    if _key is not None:
+                        results[_key] = value
+                start = int(entry_attrib["start"])
+                results["modifications"] = [
+                    f"{mass}:{at - start}" for mass, at in aa_mods
+                ]
+                results["calc_mz"] = entry_attrib["mh"]
                 aa_mods = []
                 domains.append(results)
                 results = {}
             elif entry_tag == ("note"):
-                if entry.attrib["label"] == "Description":
+                if entry_attrib["label"] == "Description":
                     results["spectrum_title"] = entry.text.split()[0]
                     results["spectrum_id"] = entry.text.split(".")[-3]
-                elif entry.attrib["label"] == "process, version":
+                elif entry_attrib["label"] == "process, version":
                     search_engine = (
                         "xtandem_"
-                        + re.search(r"(?<=Tandem )\w+", entry.text).group().lower()
+                        + tandem_version_regex.search(entry.text).group().lower()
                     )
             elif entry_tag == ("group"):
-                if "id" in entry.attrib:
-                    for attrib in list(entry.attrib):
-                        if attrib in self.mapping_dict:
-                            _key = self.mapping_dict[attrib]
-                            results[_key] = entry.attrib[attrib]
+                if "id" in entry_attrib:
+                    for attrib, value in entry_attrib.items():
+                        _key = mapping_get(attrib)
+                        if _key is not None:
+                            results[_key] = value
                     for dom in domains:
                         dom.update(results)
-                        spec_records.append(dom)
+                        append_to_columns(spec_records, dom)
                     domains = []
                     results = {}
         return spec_records, search_engine
@@ -118,50 +118,71 @@ class XTandemAlanine_Parser(IdentBaseParser):
         Returns:
             df (pd.DataFrame): dataframe with processed modification column
         """
-        unique_mods = set().union(*df["modifications"].apply(set).values)
-        unique_mod_masses = {m.split(":")[0] for m in unique_mods}
-        potential_names = {
-            m: [name for name in self.mod_mapper.mass_to_names(float(m), decimals=4)]
-            for m in unique_mod_masses
-        }
-        mod_translation = {}
-        new_mods = pd.Series("", index=df.index)
-        for m in unique_mods:
-            mass, pos = m.split(":")
-            potential_mods = potential_names[mass]
-            if len(potential_mods) == 0:
-                mod_translation[m] = None
-            else:
-                for name in potential_mods:
-                    # TODO: Is position 'any' respected here
-                    in_seq = df["sequence"].str[int(pos)].isin(
-                        set(self.mod_mapper.query(f"`Name` == '{name}'")["aa"].unique())
-                    ) & df["modifications"].str.join("|").str.contains(m)
-                    n_term = (~in_seq) & (
-                        (
-                            (
-                                "N-term"
-                                in self.mod_mapper.query(f"`Name` == '{name}'")[
-                                    "position"
-                                ].to_list()
-                            )
-                            | (
-                                "Prot-N-term"
-                                in self.mod_mapper.query(f"`Name` == '{name}'")[
-                                    "position"
-                                ].to_list()
-                            )
-                        )
-                        & df["modifications"].str.join("|").str.contains(m)
+        # One row per modification instance, with the row position in df
+        mods_per_row = df["modifications"].tolist()
+        long_mods = pd.DataFrame(
+            {
+                "row": [row for row, mods in enumerate(mods_per_row) for _ in mods],
+                "mod": list(chain.from_iterable(mods_per_row)),
+            }
+        )
+        new_mods = pd.Series("", index=range(len(df)))
+        if len(long_mods) == 0:
+            df["modifications"] = new_mods.to_numpy()
+            return df
+        mass_pos = [mod.split(":") for mod in long_mods["mod"]]
+        long_mods["mass"] = [mass for mass, _ in mass_pos]
+        long_mods["pos"] = [int(pos) for _, pos in mass_pos]
+        sequences = df["sequence"].to_numpy()[long_mods["row"]]
+        long_mods["residue"] = [
+            seq[pos] if pos < len(seq) else None
+            for seq, pos in zip(sequences, long_mods["pos"])
+        ]
+
+        # Candidate names with their residues and N-terminal flag per mass
+        candidates = []
+        name_info = {}
+        for mass in long_mods["mass"].unique():
+            for name in self.mod_mapper.mass_to_names(float(mass), decimals=4):
+                if name not in name_info:
+                    name_df = self.mod_mapper.query(f"`Name` == '{name}'")
+                    positions = name_df["position"].to_list()
+                    name_info[name] = (
+                        set(name_df["aa"].unique()),
+                        ("N-term" in positions) | ("Prot-N-term" in positions),
                     )
-                    if in_seq.sum() != 0:
-                        new_mods.loc[in_seq] += f"{name}:{int(pos)+1};"
-                    elif n_term.sum() != 0:
-                        new_mods.loc[n_term] += f"{name}:0;"
-                    else:
-                        logger.error(f"Modification {name} could not be mapped.")
-                        raise KeyError
-        df["modifications"] = new_mods.str.rstrip(";")
+                candidates.append((mass, name) + name_info[name])
+        candidates = pd.DataFrame(
+            candidates, columns=["mass", "name", "aas", "is_n_term"]
+        )
+        # Masses without any candidate name are dropped by the inner merge
+        long_mods = long_mods.merge(candidates, on="mass")
+
+        # TODO: Is position 'any' respected here
+        long_mods["in_seq"] = [
+            residue in aas
+            for residue, aas in zip(long_mods["residue"], long_mods["aas"])
+        ]
+        mapped_in_seq = long_mods.groupby(["mod", "name"])["in_seq"].transform("any")
+        n_term = ~mapped_in_seq & long_mods["is_n_term"]
+        unmapped = ~mapped_in_seq & ~long_mods.groupby(["mod", "name"])[
+            "is_n_term"
+        ].transform("any")
+        if unmapped.any():
+            name = long_mods.loc[unmapped, "name"].iloc[0]
+            logger.error(f"Modification {name} could not be mapped.")
+            raise KeyError
+
+        long_mods["mapped"] = None
+        long_mods.loc[long_mods["in_seq"], "mapped"] = (
+            long_mods["name"] + ":" + (long_mods["pos"] + 1).astype(str)
+        )
+        long_mods.loc[n_term, "mapped"] = long_mods["name"] + ":0"
+        long_mods = long_mods.dropna(subset=["mapped"])
+        new_mods.loc[long_mods["row"].unique()] = long_mods.groupby("row")[
+            "mapped"
+        ].agg(";".join)
+        df["modifications"] = new_mods.to_numpy()
 
         return df
 
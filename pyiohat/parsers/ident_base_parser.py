@@ -14,7 +14,7 @@ from peptide_mapper.mapper import UPeptideMapper
 from pyiohat.parsers.base_parser import BaseParser
 from pyiohat.parsers.misc import (
     get_compositions_and_monoisotopic_masses,
-    get_isotopologue_accuracy,
+    get_isotopologue_accuracy_batch,
     init_custom_cc,
     sort_mods,
 )
@@ -90,10 +90,14 @@ class IdentBaseParser(BaseParser):
             r"^;+(?=\w)|(?<=\w);+$|^;+$|;+(?=;)", "", regex=True
         )
 
-        # Ensure same order of modifications
-        self.df.loc[:, "modifications"] = (
-            self.df["modifications"].fillna("").str.split(";").apply(sort_mods)
-        )
+        # Ensure same order of modifications, modstrings recur across PSMs,
+        # so every unique modstring is only split and sorted once
+        modifications = self.df["modifications"].fillna("")
+        sorted_modifications = {
+            mod_string: sort_mods(mod_string.split(";"))
+            for mod_string in modifications.unique()
+        }
+        self.df.loc[:, "modifications"] = modifications.map(sorted_modifications)
 
     def assert_only_iupac_and_missing_aas(self):
         """Assert that only IUPAC nomenclature one letter amino acids are used in sequence.
@@ -223,26 +227,33 @@ class IdentBaseParser(BaseParser):
             modifications=self.df["modifications"].to_numpy(dtype=str),
             compositions=all_compositions,
             isotopic_distributions=self.cc.isotopic_distributions,
+            cpus=self.params.get("cpus", mp.cpu_count() - 1),
         )
         self.df.loc[:, "chemical_composition"] = compositions
         self.df.loc[:, "ucalc_mass"] = mono_masses
 
+        # Isotopologues only depend on the composition, so PSMs are batched by it
+        composition_rows = self.df.groupby("chemical_composition", sort=False).indices
+        charges = self.df["charge"].astype(int).to_numpy()
+        exp_mzs = self.df["exp_mz"].astype(float).to_numpy()
         with mp.Pool(
             self.params.get("cpus", mp.cpu_count() - 1),
             initializer=init_custom_cc,
             initargs=(
-                get_isotopologue_accuracy,
+                get_isotopologue_accuracy_batch,
                 self.PROTON,
             ),
         ) as pool:
-            acc = pool.starmap(
-                get_isotopologue_accuracy,
-                zip(
-                    self.df["chemical_composition"].values,
-                    self.df["charge"].astype(int).values,
-                    self.df["exp_mz"].values,
+            composition_accs = pool.starmap(
+                get_isotopologue_accuracy_batch,
+                (
+                    (composition, charges[rows], exp_mzs[rows])
+                    for composition, rows in composition_rows.items()
                 ),
             )
+        acc = np.full(len(self.df), np.nan)
+        for rows, composition_acc in zip(composition_rows.values(), composition_accs):
+            acc[rows] = composition_acc
         self.df.loc[:, "accuracy_ppm"] = acc
         self.df.loc[:, "ucalc_mz"] = self._calc_mz(
             mass=self.df["ucalc_mass"], charge=self.df["charge"]
@@ -1,104 +1,188 @@
 """Parser handler."""
 
+import multiprocessing as mp
+import re
+from functools import lru_cache
+from itertools import repeat
+
 import IsoSpecPy as iso
 import numpy as np
 import pandas as pd
-import regex as re
 from IsoSpecPy.PeriodicTbl import symbol_to_masses
 
+static_isotope_regex = re.compile(r"(?<=\))(\d+)(\w+)(?:\()(\d+)")
+
+PSMS_PER_PROCESS = 100000
 
-def get_atom_counts(sequences, modifications, compositions):
-    """Get the count occurrence of each atom in a given sequence with respective mods.
+
+@lru_cache(maxsize=32)
+def _get_element_multipliers(frozen_compositions):
+    """Get the ordered elements and the element multipliers of all compositions.
+
+    The multipliers only depend on the compositions, which recur across calls,
+    hence results are cached.
 
     Args:
-        sequences (np.array): numpy string array with sequences
-        modifications (np.array): numpy string array with modifications
-        compositions (dict of dict): dict with each amino acid and modification composition
+        frozen_compositions (tuple): (name, sorted composition items) per amino acid or mod
 
     Returns:
         elements (list): ordered uniquely occurring elements
-        atom_counts (np.array): numpy int array with PSM-level atomic composition
+        aas (list): amino acids, in multiplier row order
+        mod_names (list): modification names, in multiplier row order
+        multipliers (np.array): numpy int array with element counts per amino acid,
+            mod and finally the water loss per peptide bond
     """
     unique_elements = set()
-    for composition in compositions.values():
-        for element in composition.keys():
+    for _, composition in frozen_compositions:
+        for element, _ in composition:
             unique_elements.add(element)
 
     elements = ["C", "H"] + sorted(unique_elements - set(["C", "H"]))
 
-    atom_counts = np.zeros(shape=(len(sequences), len(elements)), dtype=int)
-    for aa_or_mod in compositions.keys():
-        ordered_element_multiplier = []
-        for element in elements:
-            ordered_element_multiplier += [compositions[aa_or_mod].get(element, 0)]
-        ordered_element_multiplier = np.array(ordered_element_multiplier)
+    aas = []
+    aa_multipliers = []
+    mod_names = []
+    mod_multipliers = []
+    for aa_or_mod, composition in frozen_compositions:
+        composition = dict(composition)
+        ordered_element_multiplier = [
+            composition.get(element, 0) for element in elements
+        ]
         # Only amino acids are length 1
         if len(aa_or_mod) == 1:
-            atom_counts += np.outer(
-                np.char.count(sequences, aa_or_mod), ordered_element_multiplier
-            )
+            aas.append(aa_or_mod)
+            aa_multipliers.append(ordered_element_multiplier)
         else:
-            mod_counts = []
-            escaped_mod_name = re.escape(aa_or_mod)
-            search_pattern = re.compile(
-                rf"(^{escaped_mod_name}:\d+)(?=;)|(?<=;)({escaped_mod_name}:\d+)(?=;)|(?<=;)({escaped_mod_name}:\d+$)|^({escaped_mod_name}:\d+)$"
-            )
-            for mod in modifications:
-                mod_counts.append(
-                    len(
-                        re.findall(
-                            search_pattern,
-                            mod,
-                        )
-                    )
-                )
-            atom_counts += np.outer(mod_counts, ordered_element_multiplier)
+            mod_names.append(aa_or_mod)
+            mod_multipliers.append(ordered_element_multiplier)
     # Remove water (peptide bonds)
-    water = np.zeros(shape=(1, len(elements)), dtype=int)
-    water[0, elements.index("H")] = 2
-    water[0, elements.index("O")] = 1
-    atom_counts -= np.outer(np.maximum(np.char.str_len(sequences) - 1, 0), water)
+    water_loss = [0] * len(elements)
+    water_loss[elements.index("H")] = -2
+    water_loss[elements.index("O")] = -1
+    multipliers = np.array(
+        aa_multipliers + mod_multipliers + [water_loss], dtype=np.int32
+    )
+
+    return elements, aas, mod_names, multipliers
+
+
+def get_atom_counts(sequences, modifications, compositions):
+    """Get the count occurrence of each atom in a given sequence with respective mods.
+
+    Args:
+        sequences (np.array): numpy string array with sequences
+        modifications (np.array): numpy string array with modifications
+        compositions (dict of dict): dict with each amino acid and modification composition
+
+    Returns:
+        elements (list): ordered uniquely occurring elements
+        atom_counts (np.array): numpy int array with PSM-level atomic composition
+    """
+    elements, aas, mod_names, multipliers = _get_element_multipliers(
+        tuple(
+            (aa_or_mod, tuple(sorted(composition.items())))
+            for aa_or_mod, composition in compositions.items()
+        )
+    )
+
+    # Count all amino acids in a single pass over the sequence bytes, every byte
+    # is mapped to its amino acid index, len(aas) for others or len(aas) + 1 for
+    # the padding of shorter sequences, so sequence lengths come from the same pass
+    n_psms = len(sequences)
+    byte_sequences = np.asarray(sequences, dtype="S")
+    max_length = byte_sequences.dtype.itemsize
+    sequence_bytes = byte_sequences.view(np.uint8).reshape(n_psms, max_length)
+    n_bins = len(aas) + 2
+    aa_lookup = np.full(256, len(aas), dtype=np.intp)
+    aa_lookup[[ord(aa) for aa in aas]] = np.arange(len(aas))
+    aa_lookup[0] = len(aas) + 1
+    row_offsets = np.arange(n_psms, dtype=np.intp)[:, None] * n_bins
+    byte_counts = np.bincount(
+        (aa_lookup[sequence_bytes] + row_offsets).ravel(),
+        minlength=n_psms * n_bins,
+    ).reshape(n_psms, n_bins)
+    # Counts of amino acids, mods and peptide bonds are written into one
+    # preallocated int32 matrix, atom counts easily fit into int32
+    n_aas = len(aas)
+    counts = np.zeros(shape=(n_psms, n_aas + len(mod_names) + 1), dtype=np.int32)
+    counts[:, :n_aas] = byte_counts[:, :n_aas]
+    if len(mod_names) > 0:
+        # Extract all mod names in a single scan, names may contain colons themselves
+        found_mods = pd.Series(modifications, dtype=str).str.extractall(
+            r"(?:^|;)(?P<mod>[^;]+):\d+(?=;|$)"
+        )
+        counts[:, n_aas:-1] = (
+            found_mods.groupby([found_mods.index.get_level_values(0), "mod"])
+            .size()
+            .unstack(fill_value=0)
+            .reindex(index=range(len(modifications)), columns=mod_names, fill_value=0)
+            .to_numpy()
+        )
+    # Peptide bonds, i.e. sequence length - 1
+    np.maximum(max_length - byte_counts[:, -1] - 1, 0, out=counts[:, -1])
+
+    # Accumulate amino acids, modifications and water loss in a single product
+    atom_counts = counts @ multipliers
 
     return elements, atom_counts
 
 
 def get_compositions_and_monoisotopic_masses(
-    sequences, modifications, compositions, isotopic_distributions
+    sequences, modifications, compositions, isotopic_distributions, cpus=1
 ):
     """Get compositions and monoisotopic masses per PSM.
 
+    Atom counts of large PSM tables are computed in chunks of at least
+    PSMS_PER_PROCESS PSMs, using up to cpus processes.
+
     Args:
         sequences (np.array): numpy string array with sequences
         modifications (np.array): numpy string array with modifications
         compositions (dict of dict): dict with each amino acid and modification composition
         isotopic_distributions (dict of dict): isotopic distributions as provided by chemical_composition
+        cpus (int, optional): maximum number of processes
 
     Returns:
         chemical_compositions (pd.Series): PSM-level chemical compositions in hill notation
         monoisotopic_masses (np.array): numpy float array with PSM-level monoisotopic masses
     """
     # Get atom counts
-    elements, atom_counts = get_atom_counts(
-        sequences=sequences, modifications=modifications, compositions=compositions
-    )
-    for i, element in enumerate(elements):
-        if i == 0:
-            chemical_compositions = np.char.add(
-                elements[i] + "(", atom_counts.astype(str)[:, i]
+    n_chunks = min(cpus, -(-len(sequences) // PSMS_PER_PROCESS))
+    if n_chunks > 1:
+        with mp.Pool(n_chunks) as pool:
+            chunk_atom_counts = pool.starmap(
+                get_atom_counts,
+                zip(
+                    np.array_split(sequences, n_chunks),
+                    np.array_split(modifications, n_chunks),
+                    repeat(compositions),
+                ),
             )
-        else:
-            next_element_string = np.char.add(
-                ")" + elements[i] + "(", atom_counts.astype(str)[:, i]
-            )
-            chemical_compositions = np.char.add(
-                chemical_compositions, next_element_string
-            )
-        if i == len(elements) - 1:
-            chemical_compositions = np.char.add(chemical_compositions, ")")
-    # Remove empties
-    chemical_compositions = pd.Series(chemical_compositions).str.replace(
-        r"\d*[A-Z][a-z]?\(0\)", "", regex=True
+        # Elements only depend on the compositions, hence are the same for all chunks
+        elements = chunk_atom_counts[0][0]
+        atom_counts = np.vstack([counts for _, counts in chunk_atom_counts])
+    else:
+        elements, atom_counts = get_atom_counts(
+            sequences=sequences, modifications=modifications, compositions=compositions
+        )
+    # Build hill notation column by column, elements with zero counts are skipped.
+    # PSMs of the same peptidoform share their counts, so only unique rows are built
+    unique_atom_counts, unique_inverse = np.unique(
+        atom_counts, axis=0, return_inverse=True
     )
+    chemical_compositions = np.full(len(unique_atom_counts), "", dtype=str)
+    for i, element in enumerate(elements):
+        element_counts = unique_atom_counts[:, i]
+        non_zero = element_counts != 0
+        if not non_zero.any():
+            continue
+        element_strings = np.char.add(
+            np.char.add(f"{element}(", element_counts.astype(str)), ")"
+        )
+        chemical_compositions = np.char.add(
+            chemical_compositions, np.where(non_zero, element_strings, "")
+        )
+    chemical_compositions = pd.Series(chemical_compositions[unique_inverse.reshape(-1)])
 
     isotope_mass_lookup = {}
     for element, isotope_data in isotopic_distributions.items():
@@ -122,8 +206,7 @@ def get_compositions_and_monoisotopic_masses(
             # Element is an isotope
             mass = isotope_mass_lookup[element]
         monoisotopic_masses.extend([mass])
-    monoisotopic_masses = np.array(monoisotopic_masses)
-    monoisotopic_masses = (atom_counts * monoisotopic_masses).sum(axis=1)
+    monoisotopic_masses = atom_counts.astype(np.float64) @ np.array(monoisotopic_masses)
 
     return chemical_compositions, monoisotopic_masses
 
@@ -150,6 +233,43 @@ def sort_mods(data):
     return sorted_formatted_mods
 
 
+def get_fixed_mods(sequences, fixed_mods):
+    """Locate fixed modifications on all sequences at once.
+
+    Sequences recur across PSMs, so only unique sequences are concatenated into a
+    single byte array, where every fixed modification is located with one
+    vectorized comparison.
+
+    Args:
+        sequences (list): peptide sequences
+        fixed_mods (iterable): (residue, modification name) pairs
+
+    Returns:
+        fixed_modifications (list): list of "Mod:pos" strings per sequence
+    """
+    unique_index = {}
+    sequence_index = [
+        unique_index.setdefault(sequence, len(unique_index)) for sequence in sequences
+    ]
+    unique_sequences = list(unique_index)
+    unique_modifications = [[] for _ in unique_sequences]
+    residues = np.frombuffer("".join(unique_sequences).encode(), dtype="S1")
+    offsets = np.zeros(len(unique_sequences) + 1, dtype=np.int64)
+    np.cumsum([len(sequence) for sequence in unique_sequences], out=offsets[1:])
+
+    for residue, mod_name in fixed_mods:
+        matches = np.flatnonzero(residues == residue.encode())
+        unique_sequence_index = np.searchsorted(offsets, matches, side="right") - 1
+        positions = matches - offsets[unique_sequence_index] + 1
+        for index, position in zip(unique_sequence_index.tolist(), positions.tolist()):
+            unique_modifications[index].append(f"{mod_name}:{position}")
+    # Every sequence gets its own list, callers may extend it with further mods
+    fixed_modifications = [
+        unique_modifications[index].copy() for index in sequence_index
+    ]
+    return fixed_modifications
+
+
 def init_custom_cc(function, proton):
     """Initialize function for multiprocessing by providing 'global' attribute.
 
@@ -164,23 +284,23 @@ def init_custom_cc(function, proton):
     function.calc_mz = _calc_mz
 
 
-def get_isotopologue_accuracy(composition, charge, exp_mz):
-    """Compute the isotopologue accuracy.
+@lru_cache(maxsize=4096)
+def _get_isotopologue_masses(composition):
+    """Compute the isotopologue masses of a chemical composition.
 
-    Only the accuracy of the isotopologue closest to the experimental mass is reported.
+    Compositions are highly repeated across PSMs, hence results are cached.
 
     Args:
         composition (str): chemical composition in hill notation
-        charge (int): charge
-        exp_mz (float): experimental spectrum mz
+
     Returns:
-        isotopologue_acc (float): accuracy in ppm
+        isotopologue_masses (np.array): numpy float array with isotopologue masses
     """
     atom_counts = None
     isotope_masses = None
     isotope_probs = None
     replaced_composition = composition
-    static_isotopes = re.findall(r"(?<=\))(\d+)(\w+)(?:\()(\d+)", composition)
+    static_isotopes = static_isotope_regex.findall(composition)
     if len(static_isotopes) != 0:
         atom_counts = []
         isotope_masses = []
@@ -205,24 +325,40 @@ def get_isotopologue_accuracy(composition, charge, exp_mz):
     else:
         formula = composition
     formula = formula.replace("(", "").replace(")", "")
-    isotopologue_masses = list(
+    isotopologue_masses = np.fromiter(
         iso.IsoThreshold(
             formula=formula,
             threshold=0.02,
             charge=1,
-            get_confs=True,
+            get_confs=False,
             atomCounts=atom_counts,
             isotopeMasses=isotope_masses,
             isotopeProbabilities=isotope_probs,
-        ).masses
+        ).masses,
+        dtype=np.float64,
     )
-    isotopologue_mzs = [
-        get_isotopologue_accuracy.calc_mz(mass, charge) for mass in isotopologue_masses
-    ]
-    # Report only most accurate mass
-    isotopologue_mz = min(
-        isotopologue_mzs,
-        key=lambda x: abs(exp_mz - x),
+    return isotopologue_masses
+
+
+def get_isotopologue_accuracy_batch(composition, charges, exp_mzs):
+    """Compute the isotopologue accuracies of all PSMs sharing a composition.
+
+    Isotopologues are enumerated only once for all charges and experimental
+    mass-to-charge ratios, only the accuracy of the isotopologue closest to the
+    experimental mass is reported per PSM.
+
+    Args:
+        composition (str): chemical composition in hill notation
+        charges (np.array): numpy int array with charges
+        exp_mzs (np.array): numpy float array with experimental spectrum mzs
+    Returns:
+        isotopologue_accs (np.array): numpy float array with accuracies in ppm
+    """
+    isotopologue_mzs = get_isotopologue_accuracy_batch.calc_mz(
+        _get_isotopologue_masses(composition)[None, :], charges[:, None]
     )
-    isotopologue_acc = (exp_mz - isotopologue_mz) / isotopologue_mz * 1e6
-    return isotopologue_acc
+    # Report only most accurate mass per PSM
+    closest = np.argmin(np.abs(exp_mzs[:, None] - isotopologue_mzs), axis=1)
+    isotopologue_mzs = isotopologue_mzs[np.arange(len(closest)), closest]
+    isotopologue_accs = (exp_mzs - isotopologue_mzs) / isotopologue_mzs * 1e6
+    return isotopologue_accs
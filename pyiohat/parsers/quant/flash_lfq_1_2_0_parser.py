@@ -1,14 +1,16 @@
 """Quant parser."""
 
-import re
-from pathlib import Path
+import multiprocessing as mp
 
+import numpy as np
 import pandas as pd
 from chemical_composition import ChemicalComposition
 
 from pyiohat.parsers.quant_base_parser import QuantBaseParser
 from pyiohat.parsers.misc import get_compositions_and_monoisotopic_masses
 
+prefixed_mod_regex = r"(?P<prefix>[^\[]*)\[(?P<name>.*?)\]"
+
 
 class FlashLFQ_1_2_0_Parser(QuantBaseParser):
     """File parser for Flash LFQ."""
@@ -30,19 +32,22 @@ class FlashLFQ_1_2_0_Parser(QuantBaseParser):
         self.df.rename(columns=self.mapping_dict, inplace=True)
         self.round_precision = 5
 
-        self.rt_to_spec_id = {}
-        self.filestem_to_path = {}
-        for key, val in self.rt_lookup.items():
-            for key2, val2 in val.items():
-                self.rt_to_spec_id.setdefault(val2[0], {})[
-                    round(key2, self.round_precision)
-                ] = key
-                if val2[0] not in self.filestem_to_path:
-                    self.filestem_to_path[Path(val2[0]).stem] = val2[0]
-
-            # round(list(d.keys())[0], self.round_precision): key
-            # for key, d in self.rt_lookup.items()
-        # }
+        # Sorted rts with their spectrum ids per file, for batched binary searches
+        file_rts = {}
+        file_spec_ids = {}
+        for spec_id, rt_dict in self.rt_lookup.items():
+            for rt, (file, _) in rt_dict.items():
+                file_rts.setdefault(file, []).append(round(rt, self.round_precision))
+                file_spec_ids.setdefault(file, []).append(spec_id)
+        self.rt_tables = {}
+        for file, rts in file_rts.items():
+            rts = np.array(rts, dtype=np.float64)
+            spec_ids = np.array(file_spec_ids[file], dtype=np.int64)
+            order = np.argsort(rts, kind="stable")
+            rts, spec_ids = rts[order], spec_ids[order]
+            # Of spectra sharing a rounded rt, the last one is kept
+            is_last = np.append(rts[1:] != rts[:-1], True)
+            self.rt_tables[file] = (rts[is_last], spec_ids[is_last])
         self.cc = ChemicalComposition()
         self.IUPAC_AAS = tuple("ACDEFGHIKLMNPQRSTUVWY")
 
@@ -58,6 +63,8 @@ class FlashLFQ_1_2_0_Parser(QuantBaseParser):
 
         """
         is_tsv = file.as_posix().endswith(".tsv")
+        if not is_tsv:
+            return False
         flash_lfq_columns = {
             "File Name",
             "Base Sequence",
@@ -85,7 +92,7 @@ class FlashLFQ_1_2_0_Parser(QuantBaseParser):
         with open(file.as_posix()) as f:
             head = set(f.readline().replace("\n", "").split("\t"))
         headers_match = len(flash_lfq_columns.difference(head)) == 0
-        return is_tsv and headers_match
+        return headers_match
 
     def unify(self):
         """Primary method to read and unify engine output.
@@ -117,19 +124,42 @@ class FlashLFQ_1_2_0_Parser(QuantBaseParser):
         return self.df
 
     def get_meta_info(self):
+        """Add the spectrum ids of the ms2 retention times as ident_reference.
+
+        Raises:
+            KeyError: if no spectrum id is found for a retention time
+        """
         rounded_rts = (self.df["flashlfq:ms2_retention_time"]).apply(
             round, args=(self.round_precision,)
         )
-        rounded_rts = pd.DataFrame(
-            {"file": self.df["raw_data_location"], "rt": rounded_rts}
-        )
-
-        self.df["ident_reference"] = [
-            self.rt_to_spec_id[f][r] for i, (f, r) in rounded_rts.iterrows()
-        ]
+        all_query_rts = rounded_rts.to_numpy(dtype=np.float64)
+        rt_tolerance = 10**-self.round_precision
+        spec_ids = np.full(len(self.df), -1, dtype=np.int64)
+        matched = np.zeros(len(self.df), dtype=bool)
+        for file, rows in self.df.groupby("raw_data_location").indices.items():
+            if file not in self.rt_tables:
+                continue
+            rts, file_spec_ids = self.rt_tables[file]
+            query_rts = all_query_rts[rows]
+            # Pick the closer of both neighbours of the insertion point
+            right = np.minimum(np.searchsorted(rts, query_rts), len(rts) - 1)
+            left = np.maximum(right - 1, 0)
+            nearest = np.where(
+                np.abs(rts[left] - query_rts) < np.abs(rts[right] - query_rts),
+                left,
+                right,
+            )
+            is_match = np.abs(rts[nearest] - query_rts) <= rt_tolerance
+            spec_ids[rows[is_match]] = file_spec_ids[nearest[is_match]]
+            matched[rows[is_match]] = True
+        if not matched.all():
+            raise KeyError(
+                f"No spectrum id found for rts {rounded_rts[~matched].tolist()}"
+            )
+        self.df["ident_reference"] = spec_ids
 
     def get_chemical_composition(self):
-        mods = self.df["flashlfq:full_sequence"].apply(self.translate_mods)
+        mods = self.translate_mods_column(self.df["flashlfq:full_sequence"])
         seqs = self.df["trivial_name"]
 
         # move to base parser?
@@ -145,23 +175,28 @@ class FlashLFQ_1_2_0_Parser(QuantBaseParser):
             modifications=mods.to_numpy(dtype=str),
             compositions=all_compositions,
             isotopic_distributions=self.cc.isotopic_distributions,
+            cpus=self.params.get("cpus", mp.cpu_count() - 1),
         )
         self.df.loc[:, "chemical_composition"] = compositions
 
-    def translate_mods(self, full_sequence):
-        """Extract modifications from full_sequence and format as {mod_1}:{pos_1};{mod_n}:{pos_n}.
+    def translate_mods_column(self, full_sequences):
+        """Extract modifications from all full sequences at once.
+
+        The position of a mod is the number of residues preceding it, i.e. the
+        cumulative length of the text between mods.
 
         Args:
-            full_sequence (str): sequence including mod (e.g. ELVISC[Carbamidomethyl]M[Oxidation])
+            full_sequences (pd.Series): sequences including mods
 
         Returns:
-            str: extracted mods as described in summary
+            pd.Series: extracted mods as {mod_1}:{pos_1};{mod_n}:{pos_n}
         """
-        # TODO extract C-terminal mods, position should be seq_len + 1
-        cumulative_match_length = 0
-        regex = re.compile(r"\[(.*?)\]")
-        mods = []
-        for match in regex.finditer(full_sequence):
-            mods.append(f"{match.group(1)}:{match.start() - cumulative_match_length}")
-            cumulative_match_length += len(match.group())
-        return ";".join(mods)
+        mods = full_sequences.reset_index(drop=True).str.extractall(prefixed_mod_regex)
+        mods = mods.fillna("")
+        positions = mods["prefix"].str.len().groupby(level=0).cumsum()
+        mods = (
+            (mods["name"] + ":" + positions.astype(str)).groupby(level=0).agg(";".join)
+        )
+        mods = mods.reindex(range(len(full_sequences)), fill_value="")
+        mods.index = full_sequences.index
+        return mods
@@ -27,6 +27,8 @@ class TMTQuantParser(QuantBaseParser):
     @classmethod
     def check_parser_compatibility(cls, file):
         is_csv = file.as_posix().endswith(".csv")
+        if not is_csv:
+            return False
         with open(file.as_posix(), "r") as fin:
             try:
                 header = "".join([next(fin) for _ in range(1)])
@@ -51,7 +53,7 @@ class TMTQuantParser(QuantBaseParser):
             "quant_value",
         }
         columns_match = len(ref_columns.difference(header)) == 0
-        return columns_match and is_csv
+        return columns_match
 
     def unify(self):
         """
@@ -1,8 +1,10 @@
 """Quant base parser class."""
 
-from pyiohat.parsers.base_parser import BaseParser
+import numpy as np
 import pandas as pd
 
+from pyiohat.parsers.base_parser import BaseParser
+
 
 class QuantBaseParser(BaseParser):
     """Base class of all quant parsers."""
@@ -24,21 +26,19 @@ class QuantBaseParser(BaseParser):
         self.sanitize()
 
     def calculate_accuracy(self):
-        accuracy_mz = self.df.loc[
-            self.df["reported_mz"] != "-", "theoretical_mz"
-        ].astype(float) - self.df.loc[
-            self.df["reported_mz"] != "-", "reported_mz"
-        ].astype(
-            float
+        """Calculate mz and ppm accuracy of reported mass-to-charge ratios.
+
+        Rows without reported mz ("-") get an accuracy of -1.
+        Operations are performed inplace on self.df
+        """
+        # Evaluate the mask and parse the mz strings only once
+        reported = (self.df["reported_mz"] != "-").to_numpy()
+        reported_mz = self.df["reported_mz"].where(reported).to_numpy(dtype=float)
+        theoretical_mz = self.df["theoretical_mz"].where(reported).to_numpy(dtype=float)
+        accuracy_mz = theoretical_mz - reported_mz
+        self.df["accuracy_ppm"] = np.where(
+            reported, accuracy_mz / reported_mz * 1e6, -1
         )
-        accuracy_ppm = (
-            (accuracy_mz)
-            / self.df.loc[self.df["reported_mz"] != "-", "reported_mz"].astype(float)
-        ) * 1e6
-        self.df.loc[self.df["reported_mz"] != "-", "accuracy_ppm"] = accuracy_ppm
-        self.df.loc[self.df["reported_mz"] == "-", "accuracy_ppm"] = -1
-        self.df.loc[self.df["reported_mz"] == "-", "reported_ppm"] = -1
-
-        self.df.loc[self.df["reported_mz"] != "-", "accuracy_mz"] = accuracy_mz
-        self.df.loc[self.df["reported_mz"] == "-", "accuracy_mz"] = -1
-        self.df.loc[self.df["reported_mz"] == "-", "reported_mz"] = -1
+        self.df.loc[~reported, "reported_ppm"] = -1
+        self.df["accuracy_mz"] = np.where(reported, accuracy_mz, -1)
+        self.df.loc[~reported, "reported_mz"] = -1
@@ -1,11 +1,13 @@
 """Unify handler."""
 
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 from importlib import import_module
 from pathlib import Path
 
 import pandas as pd
 
-from pyiohat.parsers.base_parser import BaseParser
+from pyiohat.parsers.base_parser import BaseParser, init_mapper_caches
 
 
 class Unify:
@@ -84,3 +86,74 @@ class Unify:
         self.df = self.parser.unify()
 
         return self.df
+
+
+def _unify_file(input_file, params, immutable_peptides):
+    """Unify a single input file, executed in a worker process.
+
+    Args:
+        input_file (str): path to input file
+        params (dict): ursgal param dict
+        immutable_peptides (str): path to file with immutable peptides
+
+    Returns:
+        df (pd.DataFrame): unified dataframe
+    """
+    return Unify(input_file, params, immutable_peptides).get_dataframe()
+
+
+def unify_files(input_files, params, immutable_peptides=None, num_workers=None):
+    """Unify multiple input files in parallel, one worker process per file.
+
+    The cpus in params are split between the workers, since the parsers start
+    process pools of their own.
+
+    Args:
+        input_files (list): paths to input files
+        params (dict or list of dict): ursgal param dict, shared by all files or one per file
+        immutable_peptides (str, optional): path to file with immutable peptides
+        num_workers (int, optional): number of worker processes, defaults to params["cpus"]
+
+    Returns:
+        df (pd.DataFrame): unified dataframes of all files, in order of input_files
+
+    Raises:
+        ValueError: if params is a list with a different length than input_files
+    """
+    if isinstance(params, dict):
+        params_list = [params] * len(input_files)
+    else:
+        params_list = params
+        if len(params_list) != len(input_files):
+            raise ValueError(
+                f"Got {len(params_list)} param dicts for {len(input_files)} input files."
+            )
+    if len(input_files) == 0:
+        return pd.DataFrame()
+    cpus = params_list[0].get("cpus", mp.cpu_count() - 1)
+    if num_workers is None:
+        num_workers = cpus
+    num_workers = max(min(num_workers, len(input_files)), 1)
+    worker_params_list = [
+        dict(file_params, cpus=max(file_params.get("cpus", cpus) // num_workers, 1))
+        for file_params in params_list
+    ]
+    xml_file_lists = {
+        tuple(file_params.get("xml_file_list", None) or ())
+        for file_params in params_list
+    }
+    # mp.Pool workers are daemonic and could not start the pools the parsers use
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=init_mapper_caches,
+        initargs=(list(xml_file_lists),),
+    ) as executor:
+        dfs = list(
+            executor.map(
+                _unify_file,
+                input_files,
+                worker_params_list,
+                [immutable_peptides] * len(input_files),
+            )
+        )
+    return pd.concat(dfs, ignore_index=True)
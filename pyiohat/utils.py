@@ -1,5 +1,10 @@
 """Collection of utils."""
 
+from lxml import etree
+
+# Bytes read from the start of a file to check its compatibility with a parser
+FILE_HEAD_SIZE = 8192
+
 
 def merge_and_join_dicts(list_of_dicts, delimiter):
     """Merge list of dicts with identical keys as strings into single merged dict.
@@ -16,3 +21,64 @@ def merge_and_join_dicts(list_of_dicts, delimiter):
         key: delimiter.join([str(d.get(key)) for d in list_of_dicts])
         for key in set().union(*list_of_dicts)
     }
+
+
+def iterparse_and_clear(xml_file, tag):
+    """Iterate over the end events of the requested xml elements.
+
+    Elements are cleared once they were processed and already visited siblings are
+    removed from their parent, which keeps memory usage flat on large files.
+
+    Args:
+        xml_file (str): path to xml file
+        tag (tuple): (namespaced) tags of the elements to be yielded
+
+    Yields:
+        entry (lxml.etree._Element): xml element at its end event
+    """
+    for _, entry in etree.iterparse(xml_file, events=("end",), tag=tag, huge_tree=True):
+        yield entry
+        entry.clear()
+        while entry.getprevious() is not None:
+            del entry.getparent()[0]
+
+
+def append_to_columns(columns, record):
+    """Append a record to column-wise lists.
+
+    Keys that were not seen before create a new column, which is padded with None
+    for the rows already stored. Columns missing in the record are padded as well.
+
+    Args:
+        columns (dict): column names with lists of values, modified inplace
+        record (dict): column names with values of a single row
+    """
+    n_rows = len(next(iter(columns.values()), []))
+    for key, value in record.items():
+        if key not in columns:
+            columns[key] = [None] * n_rows
+        columns[key].append(value)
+    for values in columns.values():
+        if len(values) == n_rows:
+            values.append(None)
+
+
+def extend_columns(columns, other):
+    """Extend column-wise lists with the rows of other column-wise lists.
+
+    Columns only present in one of both are padded with None for the rows of the
+    other, as in append_to_columns.
+
+    Args:
+        columns (dict): column names with lists of values, modified inplace
+        other (dict): column names with lists of values to be appended
+    """
+    n_rows = len(next(iter(columns.values()), []))
+    n_other_rows = len(next(iter(other.values()), []))
+    for key, values in other.items():
+        if key not in columns:
+            columns[key] = [None] * n_rows
+        columns[key].extend(values)
+    for values in columns.values():
+        if len(values) == n_rows:
+            values.extend([None] * n_other_rows)
@@ -115,9 +115,9 @@ def test_engine_parser_comet_map_mod_mass():
     fixed_mods, modifications = parser.map_mod_mass()
     assert fixed_mods == {"C": "Carbamidomethyl"}
     assert modifications == {
-        "57.021464": "Carbamidomethyl",
-        "15.994915": "Oxidation",
-        "42.010565": "Acetyl",
+        57.0215: "Carbamidomethyl",
+        15.9949: "Oxidation",
+        42.0106: "Acetyl",
     }
 
 
@@ -138,8 +138,8 @@ def test_engine_parsers_comet_get_spec_records():
     parser.peptide_lookup = parser.get_peptide_lookup()
     spec_records = parser.get_spec_records()
 
-    assert len(spec_records) == 60
-    assert spec_records[4] == {
+    assert len(spec_records["sequence"]) == 60
+    assert {key: values[4] for key, values in spec_records.items()} == {
         "comet:num_matched_ions": "3",
         "comet:num_unmatched_ions": "33",
         "comet:xcorr": "0.3634",
@@ -153,7 +153,7 @@ def test_engine_parsers_comet_get_spec_records():
         "modifications": "Carbamidomethyl:2;Carbamidomethyl:3",
         "spectrum_id": "2569",
     }
-    assert spec_records[58] == {
+    assert {key: values[58] for key, values in spec_records.items()} == {
         "comet:num_matched_ions": "2",
         "comet:num_unmatched_ions": "50",
         "comet:xcorr": "0.4654",
@@ -169,36 +169,18 @@ def test_engine_parsers_comet_get_spec_records():
     }
 
 
-def test_engine_parsers_comet_map_mods_sequences():
+def test_engine_parsers_comet_map_fixed_mods():
     parser = Comet_2020_01_4_Parser(input_file=None, params=None)
     parser.fixed_mods = {"C": "Carbamidomethyl", "O": "Oxidation"}
-    sequence = "ABCDEFCABC"
-    mods = parser.map_mods_sequences(sequence)
-    assert mods == "Carbamidomethyl:3;Carbamidomethyl:7;Carbamidomethyl:10"
-
-    sequence = "ABCDOEFOCABC"
-    mods = parser.map_mods_sequences(sequence)
-    assert (
-        mods
-        == "Carbamidomethyl:3;Carbamidomethyl:9;Carbamidomethyl:12;Oxidation:5;Oxidation:8"
-    )
-
-    sequence = "OOOOOCCCCCMMMMM"
-    mods = parser.map_mods_sequences(sequence)
-    assert (
-        mods
-        == "Carbamidomethyl:6;Carbamidomethyl:7;Carbamidomethyl:8;Carbamidomethyl:9;Carbamidomethyl:10;Oxidation:1;Oxidation:2;Oxidation:3;Oxidation:4;Oxidation:5"
-    )
-
-    sequence = "CD"
-    mods = parser.map_mods_sequences(sequence)
-    assert mods == "Carbamidomethyl:1"
-
-    sequence = "C"
-    mods = parser.map_mods_sequences(sequence)
-    assert mods == "Carbamidomethyl:1"
+    sequences = ["ABCDEFCABC", "ABCDOEFOCABC", "OOOOOCCCCCMMMMM", "CD", "C"]
+    mods = parser.map_fixed_mods(sequences)
+    assert [";".join(m) for m in mods] == [
+        "Carbamidomethyl:3;Carbamidomethyl:7;Carbamidomethyl:10",
+        "Carbamidomethyl:3;Carbamidomethyl:9;Carbamidomethyl:12;Oxidation:5;Oxidation:8",
+        "Carbamidomethyl:6;Carbamidomethyl:7;Carbamidomethyl:8;Carbamidomethyl:9;Carbamidomethyl:10;Oxidation:1;Oxidation:2;Oxidation:3;Oxidation:4;Oxidation:5",
+        "Carbamidomethyl:1",
+        "Carbamidomethyl:1",
+    ]
 
     parser.fixed_mods = {}
-    sequence = "ASLDPOCSADK"
-    with pytest.raises(ValueError):
-        parser.map_mods_sequences(sequence)
+    assert parser.map_fixed_mods(["ASLDPOCSADK"]) == [[]]
@@ -187,11 +187,8 @@ def test_engine_parsers_msgfplus_get_peptide_lookup():
     for pep in peptide_lookup:
         assert len(peptide_lookup[pep]) == 2
         assert pep.startswith("Pep_")
-    assert peptide_lookup["Pep_LVTDLTK"] == {"sequence": "LVTDLTK", "modifications": ""}
-    assert peptide_lookup["Pep_LVVSTQTALA"] == {
-        "sequence": "LVVSTQTALA",
-        "modifications": "",
-    }
+    assert peptide_lookup["Pep_LVTDLTK"] == ("", "LVTDLTK")
+    assert peptide_lookup["Pep_LVVSTQTALA"] == ("", "LVVSTQTALA")
 
 
 def test_engine_parsers_msgfplus_get_spec_records():
@@ -200,8 +197,8 @@ def test_engine_parsers_msgfplus_get_spec_records():
     parser.peptide_lookup = parser.get_peptide_lookup()
     spec_records = parser.get_spec_records()
 
-    assert len(spec_records) == 92
-    assert spec_records[0] == {
+    assert len(spec_records["sequence"]) == 92
+    assert {key: values[0] for key, values in spec_records.items()} == {
         "ms-gf:raw_score": "40",
         "ms-gf:denovoscore": "40",
         "ms-gf:spec_evalue": "4.4458354E-15",
@@ -216,7 +213,7 @@ def test_engine_parsers_msgfplus_get_spec_records():
         "spectrum_id": "2791",
         "retention_time_seconds": "1918.6086",
     }
-    assert spec_records[44] == {
+    assert {key: values[44] for key, values in spec_records.items()} == {
         "ms-gf:raw_score": "26",
         "ms-gf:denovoscore": "32",
         "ms-gf:spec_evalue": "2.2523169E-8",
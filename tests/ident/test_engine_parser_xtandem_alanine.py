@@ -313,8 +313,8 @@ def test_engine_parsers_xtandem_get_spec_records():
     parser = XTandemAlanine_Parser(input_file=input_file, params=None)
     spec_records, search_engine = parser.get_spec_records()
 
-    assert len(spec_records) == 79
-    assert spec_records[0] == {
+    assert len(spec_records["sequence"]) == 79
+    assert {key: values[0] for key, values in spec_records.items()} == {
         "x!tandem:delta": "0.0057",
         "x!tandem:hyperscore": "14.2",
         "x!tandem:nextscore": "8.0",
@@ -330,7 +330,7 @@ def test_engine_parsers_xtandem_get_spec_records():
         "charge": "3",
         "retention_time_seconds": "1943.05878",
     }
-    assert spec_records[70] == {
+    assert {key: values[70] for key, values in spec_records.items()} == {
         "x!tandem:delta": "2.022",
         "x!tandem:hyperscore": "10.9",
         "x!tandem:nextscore": "8.0",
@@ -59,3 +59,33 @@ def test_negative():
         compositions=compositions,
     )
     assert np.array_equal(atom_counts[0], [5, -1, 1, 4])
+
+
+def test_mod_names_with_colons():
+    compositions = {
+        "K": {"C": 6, "H": 14, "N": 2, "O": 2},
+        "Label:13C(6)": {"C": -6, "13C": 6},
+        "Label": {"H": 100},
+    }
+    modifications = np.array(
+        [
+            "Label:13C(6):1;Label:13C(6):2",
+            "Label:1",
+        ],
+        dtype=str,
+    )
+    sequences = np.array(
+        [
+            "KK",
+            "K",
+        ],
+        dtype=str,
+    )
+    elements, atom_counts = get_atom_counts(
+        sequences=sequences,
+        modifications=modifications,
+        compositions=compositions,
+    )
+    assert np.array_equal(elements, ["C", "H", "13C", "N", "O"])
+    assert np.array_equal(atom_counts[0], [0, 26, 12, 4, 3])
+    assert np.array_equal(atom_counts[1], [6, 114, 0, 2, 2])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import pyiohat.parsers.misc as misc
+from pyiohat.parsers.misc import get_compositions_and_monoisotopic_masses
+
+COMPOSITIONS = {  # these include water ...
+    "E": {"C": 5, "H": 9, "N": 1, "O": 4},
+    "K": {"C": 6, "H": 14, "N": 2, "O": 2},
+    "Magic": {"H": 100},
+}
+ISOTOPIC_DISTRIBUTIONS = {
+    "C": [(12.0, 0.9893), (13.0033548378, 0.0107)],
+    "H": [(1.00782503207, 0.999885), (2.0141017778, 0.000115)],
+    "N": [(14.0030740048, 0.99636), (15.0001088982, 0.00364)],
+    "O": [(15.99491461956, 0.99757), (16.9991317, 0.00038)],
+}
+
+
+def test_simple():
+    sequences = np.array(["E", "EK", "KEK"], dtype=str)
+    modifications = np.array(["", "Magic:2", ""], dtype=str)
+    compositions, masses = get_compositions_and_monoisotopic_masses(
+        sequences=sequences,
+        modifications=modifications,
+        compositions=COMPOSITIONS,
+        isotopic_distributions=ISOTOPIC_DISTRIBUTIONS,
+    )
+    assert compositions.to_list() == [
+        "C(5)H(9)N(1)O(4)",
+        "C(11)H(121)N(3)O(5)",
+        "C(17)H(33)N(5)O(6)",
+    ]
+    assert masses[0] == pytest.approx(147.0531577717)
+
+
+def test_chunked_processes(monkeypatch):
+    sequences = np.array(["E", "EK", "KEK", "K", "EE"] * 4, dtype=str)
+    modifications = np.array(["", "Magic:2", "", "Magic:1", ""] * 4, dtype=str)
+    expected = get_compositions_and_monoisotopic_masses(
+        sequences=sequences,
+        modifications=modifications,
+        compositions=COMPOSITIONS,
+        isotopic_distributions=ISOTOPIC_DISTRIBUTIONS,
+    )
+    monkeypatch.setattr(misc, "PSMS_PER_PROCESS", 5)
+    compositions, masses = get_compositions_and_monoisotopic_masses(
+        sequences=sequences,
+        modifications=modifications,
+        compositions=COMPOSITIONS,
+        isotopic_distributions=ISOTOPIC_DISTRIBUTIONS,
+        cpus=2,
+    )
+    assert compositions.to_list() == expected[0].to_list()
+    assert np.array_equal(masses, expected[1])
@@ -0,0 +1,29 @@
+from pyiohat.parsers.misc import get_fixed_mods
+
+FIXED_MODS = [("C", "Carbamidomethyl"), ("O", "Oxidation")]
+
+
+def test_simple():
+    sequences = ["ABCDEFCABC", "ABCDOEFOCABC", "OOOOOCCCCCMMMMM", "CD", "C", ""]
+    fixed_mods = get_fixed_mods(sequences, FIXED_MODS)
+
+    assert [";".join(mods) for mods in fixed_mods] == [
+        "Carbamidomethyl:3;Carbamidomethyl:7;Carbamidomethyl:10",
+        "Carbamidomethyl:3;Carbamidomethyl:9;Carbamidomethyl:12;Oxidation:5;Oxidation:8",
+        "Carbamidomethyl:6;Carbamidomethyl:7;Carbamidomethyl:8;Carbamidomethyl:9;Carbamidomethyl:10;Oxidation:1;Oxidation:2;Oxidation:3;Oxidation:4;Oxidation:5",
+        "Carbamidomethyl:1",
+        "Carbamidomethyl:1",
+        "",
+    ]
+
+
+def test_no_fixed_mods():
+    assert get_fixed_mods(["ASLDPOCSADK", "C"], []) == [[], []]
+
+
+def test_repeated_sequences_get_own_lists():
+    fixed_mods = get_fixed_mods(["CK", "PEPTIDE", "CK"], FIXED_MODS)
+    assert fixed_mods == [["Carbamidomethyl:1"], [], ["Carbamidomethyl:1"]]
+
+    fixed_mods[0].append("Oxidation:2")
+    assert fixed_mods[2] == ["Carbamidomethyl:1"]
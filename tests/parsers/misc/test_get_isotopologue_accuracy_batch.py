@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from pyiohat.parsers.misc import get_isotopologue_accuracy_batch, init_custom_cc
+
+PROTON = 1.00727646677
+
+
+def test_closest_isotopologue_accuracy():
+    init_custom_cc(get_isotopologue_accuracy_batch, PROTON)
+    composition = "C(44)H(70)13C(6)N(12)O(15)S(1)"
+    charges = np.array([1, 2, 3])
+    exp_mzs = np.array([1117.5085, 559.7585, 373.5094])
+    accuracies = get_isotopologue_accuracy_batch(composition, charges, exp_mzs)
+    assert accuracies == pytest.approx([0.593943, -1.310891, 2.191799], abs=1e-5)
@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import pandas as pd
 import pytest
 
 from pyiohat.parsers.quant.flash_lfq_1_2_0_parser import (
@@ -116,19 +117,46 @@ def test_engine_parsers_flashLFQ_extract_mods():
             ],
         },
     )
-    test_sequence = "ELC[Carbamidomethyl]"
-    mods = parser.translate_mods(test_sequence)
-    assert mods == "Carbamidomethyl:3"
-
-    test_sequence2 = "ELC[Carbamidomethyl]MMMM[Oxidation]"
-    mods = parser.translate_mods(test_sequence2)
-    assert mods == "Carbamidomethyl:3;Oxidation:7"
-
-    test_sequence3 = "[Acetyl]ELC[Carbamidomethyl]MMMM[Oxidation]"
-    mods = parser.translate_mods(test_sequence3)
-    assert mods == "Acetyl:0;Carbamidomethyl:3;Oxidation:7"
+    test_sequences = pd.Series(
+        [
+            "ELC[Carbamidomethyl]",
+            "ELC[Carbamidomethyl]MMMM[Oxidation]",
+            "[Acetyl]ELC[Carbamidomethyl]MMMM[Oxidation]",
+        ]
+    )
+    mods = parser.translate_mods_column(test_sequences)
+    assert mods.to_list() == [
+        "Carbamidomethyl:3",
+        "Carbamidomethyl:3;Oxidation:7",
+        "Acetyl:0;Carbamidomethyl:3;Oxidation:7",
+    ]
 
     # TODO encode C-terminal mods
     # test_sequence4 = "[Acetyl]ELC[Carbamidomethyl]MMMM[Oxidation][TERMINALMOD]"
-    # mods = parser.extract_mods(test_sequence4)
-    # assert mods == "Acetyl:0;Carbamidomethyl:3;Oxidation:7;TERMINALMOD:8"
+    # mods = parser.translate_mods_column(pd.Series([test_sequence4]))
+    # assert mods[0] == "Acetyl:0;Carbamidomethyl:3;Oxidation:7;TERMINALMOD:8"
+
+
+def test_engine_parsers_flashLFQ_extract_mods_column():
+    input_file = pytest._test_path / "data" / "flash_lfq_1_2_0_quantified_peaks.tsv"
+    rt_lookup_path = pytest._test_path / "data" / "BSA2_ursgal_lookup.csv"
+
+    parser = FlashLFQ_1_2_0_Parser(
+        input_file,
+        params={
+            "rt_pickle_name": rt_lookup_path,
+        },
+    )
+    full_sequences = pd.Series(
+        [
+            "ELC[Carbamidomethyl]",
+            "ELVISLIVES",
+            "[Acetyl]ELC[Carbamidomethyl]MMMM[Oxidation]",
+        ]
+    )
+    mods = parser.translate_mods_column(full_sequences)
+    assert mods.to_list() == [
+        "Carbamidomethyl:3",
+        "",
+        "Acetyl:0;Carbamidomethyl:3;Oxidation:7",
+    ]
@@ -30,3 +30,34 @@ def test_base_parser_read_rt_lookup_file_wo_precursor_mz_info():
     assert 1534.4619140625 in rt_lookup[2450]
     assert rt_lookup[2450][1534.4619140625][0] == "path/for/glory.mzML"
     assert rt_lookup[2450][1534.4619140625][1] is np.nan
+
+
+def test_base_parsers_do_not_share_modification_state():
+    oxidation_parser = BaseParser(
+        None,
+        params={
+            "modifications": [
+                {"aa": "M", "type": "opt", "position": "any", "name": "Oxidation"},
+            ]
+        },
+    )
+    oxidation_combos = oxidation_parser.mod_mapper.mass_to_combos(
+        2 * 15.994915, n=2, decimals=4
+    )
+    phospho_parser = BaseParser(
+        None,
+        params={
+            "modifications": [
+                {"aa": "S", "type": "opt", "position": "any", "name": "Phospho"},
+            ]
+        },
+    )
+    phospho_combos = phospho_parser.mod_mapper.mass_to_combos(
+        2 * 79.966331, n=2, decimals=4
+    )
+    assert [names for _, names in oxidation_combos] == [["Oxidation", "Oxidation"]]
+    assert [names for _, names in phospho_combos] == [["Phospho", "Phospho"]]
+    assert (
+        phospho_parser.mod_mapper.mass_to_combos(2 * 15.994915, n=2, decimals=4) == []
+    )
+    assert oxidation_parser.cc is not phospho_parser.cc
@@ -5,7 +5,7 @@ import pandas as pd
 import pytest
 
 from pyiohat.parsers.ident_base_parser import IdentBaseParser
-from pyiohat.utils import merge_and_join_dicts
+from pyiohat.utils import extend_columns, merge_and_join_dicts
 
 
 def test_base_parser_read_rt_lookup_file():
@@ -429,6 +429,12 @@ def test_merge_and_join_dicts():
     assert out_dict == {"a": "part_a;part_b", "b": "part_a;part_b"}
 
 
+def test_extend_columns():
+    columns = {"a": [1, 2], "b": [3, 4]}
+    extend_columns(columns, {"a": [5], "c": [6]})
+    assert columns == {"a": [1, 2, 5], "b": [3, 4, None], "c": [None, None, 6]}
+
+
 def test_assert_only_iupac_and_missing_aas():
     obj = IdentBaseParser(
         input_file=None,
@@ -15,7 +15,7 @@ from pyiohat.parsers.ident.msgfplus_2021_03_22_parser import (
 )
 from pyiohat.parsers.ident.omssa_2_1_9_parser import Omssa_Parser
 from pyiohat.parsers.ident.xtandem_alanine import XTandemAlanine_Parser
-from pyiohat.unify import Unify
+from pyiohat.unify import Unify, unify_files
 
 
 def test_unify_get_parser_classes():
@@ -303,3 +303,40 @@ def test_unify_get_mascot_parser():
         },
     )
     assert isinstance(u.parser, Mascot_2_6_2_Parser)
+
+
+def test_unify_files():
+    input_file = pytest._test_path / "data" / "BSA1_comet_2020_01_4.mzid"
+    params = {
+        "cpus": 2,
+        "enzyme": "(?<=[KR])(?![P])",
+        "terminal_cleavage_site_integrity": "any",
+        "validation_score_field": {"comet_2020_01_4": "comet:e_value"},
+        "bigger_scores_better": {"comet_2020_01_4": False},
+        "rt_pickle_name": pytest._test_path / "data" / "BSA1_ursgal_lookup.csv",
+        "database": pytest._test_path / "data" / "BSA.fasta",
+        "modifications": [
+            {
+                "aa": "M",
+                "type": "opt",
+                "position": "any",
+                "name": "Oxidation",
+            },
+            {
+                "aa": "C",
+                "type": "fix",
+                "position": "any",
+                "name": "Carbamidomethyl",
+            },
+        ],
+    }
+    single_df = Unify(input_file, params).get_dataframe()
+    df = unify_files([input_file, input_file], params)
+    assert len(df) == 2 * len(single_df)
+    assert df["spectrum_id"].tolist() == 2 * single_df["spectrum_id"].tolist()
+
+
+def test_unify_files_params_length_mismatch():
+    input_file = pytest._test_path / "data" / "BSA1_comet_2020_01_4.mzid"
+    with pytest.raises(ValueError):
+        unify_files([input_file, input_file], [{"cpus": 1}])